@@ -0,0 +1,114 @@
+import json
+import click
+from flask import current_app
+from flask.cli import AppGroup, with_appcontext
+from backend import db
+from backend.models import TicketCounters
+from backend.services import counters, crm, indexes, outbox, search
+
+
+def init_database():
+    """
+    Create missing tables and columns and the ticket search index, and fill
+    the ticket counters from the tickets table while they are empty
+    """
+    db.create_all()
+    indexes.add_columns()
+    if TicketCounters.query.first() is None:
+        counters.rebuild()
+    return search.install()
+
+
+@click.command('init-db')
+@with_appcontext
+def init_db():
+    """Create missing tables and the ticket search index (run once per deploy)"""
+    backend = init_database()
+    click.echo(f"Database created, ticket search backend: {backend}")
+
+
+counters_cli = AppGroup('counters', help='Maintain the materialized ticket counters.')
+
+
+@counters_cli.command('rebuild')
+def rebuild_counters():
+    """Recompute every counter from the tickets table"""
+    names, customers = counters.rebuild()
+    click.echo(f"Rebuilt {names} counters and {customers} customer totals.")
+
+
+@counters_cli.command('verify')
+def verify_counters():
+    """Compare stored counters against a fresh recount"""
+    mismatches = counters.verify()
+    if not mismatches:
+        click.echo("Counters are consistent.")
+        return
+    for name, stored, expected in mismatches:
+        click.echo(f"{name}: stored={stored} expected={expected}")
+    raise SystemExit(1)
+
+
+outbox_cli = AppGroup('outbox', help='Deliver queued CRM syncs.')
+
+
+@outbox_cli.command('run')
+def run_outbox():
+    """Run the CRM outbox dispatcher in this process until interrupted"""
+    click.echo("Draining CRM outbox, press Ctrl+C to stop.")
+    outbox.run_forever(current_app._get_current_object())
+
+
+@outbox_cli.command('drain')
+def drain_outbox():
+    """Send every currently due outbox row once and exit"""
+    total = 0
+    options = outbox.drain_kwargs(current_app.config)
+    # Nothing left to wait for, flush partial batches immediately
+    options['batch_max_wait'] = 0
+    while processed := outbox.drain_once(**options):
+        total += processed
+    click.echo(f"Processed {total} outbox rows.")
+    for operation, stats in crm.client.stats.snapshot()['operations'].items():
+        click.echo(f"  {operation}: {stats['calls']} calls, {stats['items']} items, "
+                   f"{stats['errors']} errors, {stats['avg_latency_ms']} ms avg")
+
+
+search_cli = AppGroup('search', help='Manage the ticket full-text index.')
+
+
+@search_cli.command('init')
+def init_search():
+    """Create (and backfill) the full-text index for the configured database"""
+    backend = search.install()
+    click.echo(f"Ticket search backend: {backend}")
+
+
+indexes_cli = AppGroup('indexes', help='Audit and migrate table indexes.')
+
+
+@indexes_cli.command('audit')
+@click.option('--json', 'as_json', is_flag=True, help='Print the report as JSON')
+def audit_indexes(as_json):
+    """EXPLAIN the queries the read endpoints run and list unused indexes"""
+    report = indexes.audit(current_app._get_current_object())
+    if as_json:
+        click.echo(json.dumps(report, indent=2))
+        return
+    for query in report['queries']:
+        flag = 'FULL SCAN' if query['full_scan'] else ', '.join(query['indexes']) or 'no index'
+        click.echo(f"[{flag}] {query['calls']}x {query['shape'][:200]}")
+        for line in query['plan']:
+            click.echo(f"    {line}")
+    for table, names in report['unused_indexes'].items():
+        click.echo(f"Unused indexes on {table}: {', '.join(names) or 'none'}")
+
+
+@indexes_cli.command('migrate')
+@click.option('--dry-run', is_flag=True, help='Only print what would change')
+def migrate_indexes(dry_run):
+    """Create the composite ticket indexes and drop the single-column ones they replace"""
+    created, dropped = indexes.migrate(dry_run=dry_run)
+    prefix = 'Would ' if dry_run else ''
+    click.echo(f"{prefix}create: {', '.join(created) or 'nothing'}")
+    click.echo(f"{prefix}drop: {', '.join(dropped) or 'nothing'}")
@@ -1,8 +1,15 @@
 from backend.models.customers import Customers, Users
-from backend.models.ticket import Tickets
+from backend.models.ticket import Tickets, TicketTombstones
+from backend.models.counters import TicketCounters, CustomerTicketCounts, DataVersions
+from backend.models.outbox import CrmOutbox
 
 __all__ = [
     "Customers",
     "Tickets",
-    "Users"
-]
\ No newline at end of file
+    "TicketTombstones",
+    "Users",
+    "TicketCounters",
+    "CustomerTicketCounts",
+    "DataVersions",
+    "CrmOutbox",
+]
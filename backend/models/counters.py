@@ -0,0 +1,21 @@
+from backend import db
+
+
+class TicketCounters(db.Model):
+    __tablename__ = 'ticket_counters'
+    # e.g. 'total', 'status:Open', 'priority:High', 'open_priority:High'
+    name = db.Column(db.String(128), primary_key=True)
+    value = db.Column(db.Integer, nullable=False, default=0)
+
+
+class CustomerTicketCounts(db.Model):
+    __tablename__ = 'customer_ticket_counts'
+    customer_id = db.Column(db.Integer, db.ForeignKey('customers.id', ondelete='CASCADE'), primary_key=True)
+    total = db.Column(db.Integer, nullable=False, default=0, index=True)
+
+
+class DataVersions(db.Model):
+    """Per-table version, bumped in the same transaction as every write ('tickets', 'customers')"""
+    __tablename__ = 'data_versions'
+    name = db.Column(db.String(64), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
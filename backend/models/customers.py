@@ -1,7 +1,7 @@
 from datetime import datetime
 from flask_login import UserMixin
-from werkzeug.security import generate_password_hash, check_password_hash
 from backend import db
+from backend.services.passwords import hasher
 
 class Customers(UserMixin, db.Model):
     __tablename__ = 'customers'
@@ -24,8 +24,11 @@ class Users(UserMixin, db.Model):
     assigned_tickets = db.relationship('Tickets', backref='agent', lazy='dynamic')
 
     def set_password(self, password):
-        self.password = generate_password_hash(password)
+        self.password = hasher.hash(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password, password)
+        return hasher.verify(self.password, password)
+
+    def password_needs_rehash(self):
+        return hasher.needs_rehash(self.password)
 
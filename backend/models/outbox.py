@@ -0,0 +1,20 @@
+from datetime import datetime
+from backend import db
+
+
+class CrmOutbox(db.Model):
+    """CRM sync work written in the same transaction as the ticket/customer change"""
+    __tablename__ = 'crm_outbox'
+    __table_args__ = (
+        db.Index('ix_crm_outbox_status_next_attempt', 'status', 'next_attempt_at'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    event = db.Column(db.String(50), nullable=False)  # ticket.create, ticket.update, customer.create
+    ticket_id = db.Column(db.Integer, nullable=True)
+    customer_id = db.Column(db.Integer, nullable=True)
+    payload = db.Column(db.Text, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='pending')  # pending, done, failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    last_error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
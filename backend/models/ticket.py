@@ -3,15 +3,35 @@ from backend import db
 
 class Tickets(db.Model):
     __tablename__ = 'tickets'
+    __table_args__ = (
+        # updated_at pagination
+        db.Index('ix_tickets_updated_at_id', 'updated_at', 'id'),
+        # Keyset for delta sync
+        db.Index('ix_tickets_change_seq_id', 'change_seq', 'id'),
+        # status IN (...) AND priority IN (...) list filters in id order, and the counters' GROUP BY
+        db.Index('ix_tickets_status_priority_id', 'status', 'priority', 'id'),
+        # Per-customer counts; also serves the customer_id foreign key
+        db.Index('ix_tickets_customer_id_status', 'customer_id', 'status'),
+    )
     id = db.Column(db.Integer, primary_key=True)
-    title = db.Column(db.String(100), index=True)
-    description = db.Column(db.String(256), index=True, nullable=False)
-    status = db.Column(db.String(50), index=True, nullable=False, default='Open')
-    priority = db.Column(db.String(50), index=True, nullable=False, default='Medium')
-    category = db.Column(db.String(50), index=True, default='General')
+    title = db.Column(db.String(100))
+    description = db.Column(db.String(256), nullable=False)
+    status = db.Column(db.String(50), nullable=False, default='Open')
+    priority = db.Column(db.String(50), nullable=False, default='Medium')
+    category = db.Column(db.String(50), default='General')
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     assigned_to_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
     customer_id = db.Column(db.Integer, db.ForeignKey('customers.id'), nullable=False)
     customer = db.relationship('Customers', backref='tickets', lazy=True)
-    hubspot_ticket_id = db.Column(db.String(128), nullable=True)
\ No newline at end of file
+    hubspot_ticket_id = db.Column(db.String(128), nullable=True)
+    # data_versions('tickets') of the write that last changed the ticket: increases in commit order
+    change_seq = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
+
+class TicketTombstones(db.Model):
+    """Ids of deleted tickets, so delta sync clients can drop them"""
+    __tablename__ = 'ticket_tombstones'
+    ticket_id = db.Column(db.Integer, primary_key=True)
+    deleted_at = db.Column(db.DateTime, default=datetime.utcnow, index=True, nullable=False)
+    change_seq = db.Column(db.Integer, nullable=False, default=0, server_default='0', index=True)
@@ -3,10 +3,16 @@ from backend.routes.auth import auth_bp
 from backend.routes.customer import cust_bp
 from backend.routes.ticket import ticket_bp
 from backend.routes.dashboard import dash_bp
+from backend.routes.metrics import metrics_bp
+from backend.routes.bulk import bulk_bp
+from backend.routes.stream import stream_bp
 
 __all__ = [
     "auth_bp",
     "cust_bp",
     "ticket_bp",
     "dash_bp",
+    "metrics_bp",
+    "bulk_bp",
+    "stream_bp",
 ]
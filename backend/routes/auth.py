@@ -1,7 +1,12 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity, unset_jwt_cookies
+from flask_jwt_extended import (create_access_token, jwt_required, get_jwt, get_current_user, unset_jwt_cookies,
+                                verify_jwt_in_request)
+from flask_jwt_extended.exceptions import JWTExtendedException
+from jwt import PyJWTError
 from backend import db
 from backend.models import Users
+from backend.services import identity, login_throttle, passwords
+from backend.services.passwords import HasherBusy
 
 def load_user(id):
     return Users.query.get(int(id))
@@ -35,7 +40,10 @@ def register():
         email=email,
         name=name
     )
-    new_user.set_password(password)
+    try:
+        new_user.set_password(password)
+    except HasherBusy:
+        return busy_response()
 
     try:
         db.session.add(new_user)
@@ -49,9 +57,27 @@ def register():
 @auth_bp.route('/api/login', methods=['POST'])
 def login():
     data = request.get_json()
-    user = Users.query.filter_by(username=data.get('username')).first()
+    username = data.get('username')
+
+    # Refuse brute-force traffic before looking the user up or hashing anything
+    retry_after = login_throttle.retry_after(username, request.remote_addr)
+    if retry_after:
+        response = jsonify({'error': 'Too many failed login attempts, try again later'})
+        response.headers['Retry-After'] = str(int(retry_after) + 1)
+        return response, 429
+
+    user = Users.query.filter_by(username=username).first()
+
+    try:
+        valid = user is not None and user.check_password(data.get('password'))
+    except HasherBusy:
+        return busy_response()
+
+    if valid:
+        login_throttle.record_success(username, request.remote_addr)
+        if user.password_needs_rehash():
+            rehash_password(user, data.get('password'))
 
-    if user and user.check_password(data.get('password')):
         access_token = create_access_token(identity=str(user.id))
 
         return jsonify({
@@ -61,27 +87,52 @@ def login():
             'access_token': access_token
         }), 200
 
+    login_throttle.record_failure(username, request.remote_addr)
     return jsonify({'error': 'Invalid credentials'}), 401
 
 
+def rehash_password(user, password):
+    """Store the password under the current PASSWORD_HASH_METHOD; the login succeeds either way"""
+    try:
+        user.set_password(password)
+        db.session.commit()
+        passwords.counters.inc('rehashes')
+    except HasherBusy:
+        db.session.rollback()
+    except Exception as e:
+        db.session.rollback()
+        print(f"Warning: password rehash for user {user.id} failed: {e}")
+
+
+def busy_response():
+    response = jsonify({'error': 'Server busy, try again shortly'})
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
+
 @auth_bp.route('/api/logout',methods=['POST'])
 def logout():
+    # Logging out always succeeds: without a valid token (none, expired, already revoked)
+    # there is nothing to revoke, but any cookies are still cleared
+    try:
+        verify_jwt_in_request(optional=True)
+    except (JWTExtendedException, PyJWTError):
+        pass
+    else:
+        if get_jwt():
+            identity.revoke(get_jwt())
     response = jsonify({'message': 'Logged out'})
     unset_jwt_cookies(response)
     return response, 200
 
 
 @auth_bp.route('/api/check_auth', methods=['GET'])
-@jwt_required
+@jwt_required()
 def check_auth():
-    current_user_id = get_jwt_identity()
-    user = Users.query.get(int(current_user_id))
-
-    if user.is_authenticated:
-        return jsonify({
-            'authenticated': True,
-            'name': user.name,
-            'user_id': user.id
-        }), 200
-    else:
-        return jsonify({'authenticated': False}), 401
\ No newline at end of file
+    # Loaded from the identity cache by the JWT user lookup; no query on a hit
+    user = get_current_user()
+    return jsonify({
+        'authenticated': True,
+        'name': user['name'],
+        'user_id': user['id']
+    }), 200
@@ -0,0 +1,237 @@
+import json
+from datetime import datetime
+from flask import Blueprint, request, jsonify, current_app
+from flask_jwt_extended import jwt_required
+from pydantic import ValidationError
+from sqlalchemy import insert
+from backend import db
+from backend.models import Tickets, Customers, CrmOutbox
+from backend.schemas import TicketImportSchema, CustomerCreateSchema
+from backend.services.bulk import detect_format, iter_records, chunked, validation_message
+from backend.services import etag, events
+from backend.services.counters import record_ticket_inserts
+
+bulk_bp = Blueprint('bulk', __name__)
+
+MAX_CHUNK_SIZE = 10000
+
+
+def chunk_size_arg():
+    size = int(request.args.get('chunk_size', current_app.config['IMPORT_CHUNK_SIZE']))
+    return max(1, min(size, MAX_CHUNK_SIZE))
+
+
+@bulk_bp.route('/api/import/tickets', methods=['POST'])
+@jwt_required()
+def import_tickets():
+    """
+    Bulk import tickets from a CSV or NDJSON request body.
+
+    Columns/keys: title, description, priority, customer_id and optionally
+    status and category. Rows are validated and inserted chunk by chunk, each
+    chunk in its own transaction, and the response lists every rejected row.
+    Imported tickets are not pushed to the CRM.
+
+        curl -X POST -H 'Content-Type: text/csv' --data-binary @tickets.csv \
+            -H 'Authorization: Bearer <token>' http://127.0.0.1:5000/api/import/tickets
+    """
+    fmt = detect_format(request.content_type, request.args.get('format'))
+    if not fmt:
+        return jsonify({'error': 'Send text/csv or application/x-ndjson (or pass ?format=csv|ndjson)'}), 415
+
+    try:
+        chunk_size = chunk_size_arg()
+    except ValueError:
+        return jsonify({'error': 'chunk_size must be an integer'}), 400
+
+    imported = 0
+    errors = []
+
+    for chunk in chunked(iter_records(request.stream, fmt), chunk_size):
+        # 1. Validate every row of the chunk
+        valid = []
+        for row_number, record, error in chunk:
+            if error:
+                errors.append({'row': row_number, 'error': error})
+                continue
+            try:
+                valid.append((row_number, TicketImportSchema(**record)))
+            except ValidationError as e:
+                errors.append({'row': row_number, 'error': validation_message(e)})
+
+        if not valid:
+            continue
+
+        # 2. Resolve all customer ids of the chunk in one query
+        customer_ids = {ticket.customer_id for _, ticket in valid}
+        existing = {
+            customer_id for (customer_id,) in
+            db.session.query(Customers.id).filter(Customers.id.in_(customer_ids))
+        }
+
+        now = datetime.utcnow()
+        rows = []
+        for row_number, ticket in valid:
+            if ticket.customer_id not in existing:
+                errors.append({'row': row_number, 'error': f'Customer not found with ID {ticket.customer_id}'})
+                continue
+            rows.append({
+                'title': ticket.title,
+                'description': ticket.description,
+                'priority': ticket.priority,
+                'status': ticket.status,
+                'category': ticket.category,
+                'customer_id': ticket.customer_id,
+                'created_at': now,
+                'updated_at': now,
+            })
+
+        if not rows:
+            continue
+
+        # 3. One executemany INSERT and one commit per chunk
+        try:
+            # Counters, then the change sequence: the same lock order as the single-ticket routes
+            record_ticket_inserts((r['status'], r['priority'], r['customer_id']) for r in rows)
+            change_seq = etag.next_change('tickets')
+            db.session.execute(insert(Tickets), [{**row, 'change_seq': change_seq} for row in rows])
+            events.emit('tickets.imported', {'count': len(rows)})
+            db.session.commit()
+            imported += len(rows)
+        except Exception as e:
+            db.session.rollback()
+            errors.extend(
+                {'row': row_number, 'error': f'Database error: {str(e)}'}
+                for row_number, ticket in valid if ticket.customer_id in existing
+            )
+
+    return jsonify({
+        'message': 'Import finished',
+        'imported': imported,
+        'failed': len(errors),
+        'errors': errors,
+    }), 200
+
+
+@bulk_bp.route('/api/import/customers', methods=['POST'])
+@jwt_required()
+def import_customers():
+    """
+    Bulk import customers from a CSV or NDJSON request body.
+
+    Columns/keys: firstname, lastname, email, company, phone. Emails already
+    present earlier in the upload or in the database are rejected with one
+    set-based lookup per chunk. Pass ?sync_crm=true to queue a HubSpot contact
+    sync for every imported customer.
+    """
+    fmt = detect_format(request.content_type, request.args.get('format'))
+    if not fmt:
+        return jsonify({'error': 'Send text/csv or application/x-ndjson (or pass ?format=csv|ndjson)'}), 415
+
+    try:
+        chunk_size = chunk_size_arg()
+    except ValueError:
+        return jsonify({'error': 'chunk_size must be an integer'}), 400
+    sync_crm = request.args.get('sync_crm', 'false').lower() == 'true'
+
+    imported = 0
+    errors = []
+    seen_emails = set()
+
+    for chunk in chunked(iter_records(request.stream, fmt), chunk_size):
+        # 1. Validate and de-duplicate within the upload
+        valid = []
+        for row_number, record, error in chunk:
+            if error:
+                errors.append({'row': row_number, 'error': error})
+                continue
+            try:
+                customer = CustomerCreateSchema(**record)
+            except ValidationError as e:
+                errors.append({'row': row_number, 'error': validation_message(e)})
+                continue
+            except TypeError:
+                # The schema's name validators do not accept null names
+                errors.append({'row': row_number, 'error': 'firstname/lastname cannot be null'})
+                continue
+
+            email_key = customer.email.lower()
+            if email_key in seen_emails:
+                errors.append({'row': row_number, 'error': 'Duplicate email in upload'})
+                continue
+            seen_emails.add(email_key)
+            valid.append((row_number, customer))
+
+        if not valid:
+            continue
+
+        # 2. One lookup against existing emails for the whole chunk. A plain IN so the unique email
+        # index serves it; MySQL's default collation already ignores case, like the upload check
+        existing = {
+            email.lower() for (email,) in
+            db.session.query(Customers.email).filter(Customers.email.in_([c.email for _, c in valid]))
+        }
+
+        rows = []
+        crm_rows = []
+        now = datetime.utcnow()
+        for row_number, customer in valid:
+            if customer.email.lower() in existing:
+                errors.append({'row': row_number, 'error': 'Email already exists'})
+                continue
+            rows.append({
+                'firstname': customer.firstname,
+                'lastname': customer.lastname,
+                'email': customer.email,
+                'company': customer.company,
+                'phone': customer.phone,
+                'created_at': now,
+            })
+            if sync_crm:
+                crm_rows.append({
+                    'event': 'customer.create',
+                    'payload': json.dumps({
+                        "email": customer.email,
+                        "firstname": customer.firstname,
+                        "lastname": customer.lastname,
+                        "company": customer.company if customer.company else None,
+                        'phone': customer.phone
+                    }),
+                    'status': 'pending',
+                    'attempts': 0,
+                    'next_attempt_at': now,
+                    'created_at': now,
+                })
+
+        if not rows:
+            continue
+
+        # 3. executemany INSERTs and one commit per chunk
+        try:
+            db.session.execute(insert(Customers), rows)
+            if crm_rows:
+                # The dispatcher holds a customer's tickets until its contact is sent, so record whose row it is
+                ids = dict(
+                    db.session.query(Customers.email, Customers.id)
+                    .filter(Customers.email.in_([row['email'] for row in rows]))
+                )
+                for row, crm_row in zip(rows, crm_rows):
+                    crm_row['customer_id'] = ids[row['email']]
+                db.session.execute(insert(CrmOutbox), crm_rows)
+            etag.bump('customers')
+            events.emit('customers.imported', {'count': len(rows)})
+            db.session.commit()
+            imported += len(rows)
+        except Exception as e:
+            db.session.rollback()
+            errors.extend(
+                {'row': row_number, 'error': f'Database error: {str(e)}'}
+                for row_number, customer in valid if customer.email.lower() not in existing
+            )
+
+    return jsonify({
+        'message': 'Import finished',
+        'imported': imported,
+        'failed': len(errors),
+        'errors': errors,
+    }), 200
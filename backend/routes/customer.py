@@ -1,16 +1,49 @@
-import requests
 from flask import Blueprint, request, jsonify
 from pydantic import ValidationError
+from sqlalchemy import func
 from backend.schemas import CustomerCreateSchema, CustomerUpdateSchema
-from backend import db,CUSTOMER_SERVICE_URL
+from backend import db
 from backend.models import Customers
+from backend.services import cache, etag, events, outbox
 
 cust_bp = Blueprint('customer_bp', __name__)
 
+MAX_PAGE_SIZE = 1000
+
 @cust_bp.route('/api/view_customers', methods=['GET'])
+@etag.conditional('customers')
+@cache.cached('customers')
 def get_customers():
-    """Get all customers"""
-    customers = Customers.query.all()
+    """
+    Get all customers, ordered by id.
+
+    Query params (optional, for paging):
+        limit: page size (max 1000); the next page cursor is returned in X-Next-Cursor
+        after: cursor returned by the previous page (the last id seen)
+        count: 'true' adds the number of customers in X-Total-Count
+    """
+    limit = request.args.get('limit')
+    after = request.args.get('after')
+    try:
+        limit = min(int(limit), MAX_PAGE_SIZE) if limit else None
+        after = int(after) if after else None
+    except ValueError:
+        return jsonify({'error': 'limit and after must be integers'}), 400
+    if limit is not None and limit < 1:
+        return jsonify({'error': 'limit must be positive'}), 400
+
+    query = Customers.query.order_by(Customers.id)
+    if after is not None:
+        query = query.filter(Customers.id > after)
+    if limit is None:
+        customers = query.all()
+        has_more = False
+    else:
+        # One extra row tells whether another page exists
+        customers = query.limit(limit + 1).all()
+        has_more = len(customers) > limit
+        customers = customers[:limit]
+
     output = []
     for c in customers:
         output.append({
@@ -21,7 +54,12 @@ def get_customers():
             'company': c.company,
             'phone':c.phone,
         })
-    return jsonify(output), 200
+    response = jsonify(output)
+    if has_more:
+        response.headers['X-Next-Cursor'] = str(customers[-1].id)
+    if limit and request.args.get('count', 'false').lower() == 'true':
+        response.headers['X-Total-Count'] = str(db.session.query(func.count(Customers.id)).scalar())
+    return response, 200
 
 @cust_bp.route('/api/add_customers', methods=['POST'])
 def create_customer():
@@ -47,21 +85,7 @@ def create_customer():
         phone=validated.phone
     )
 
-    try:
-        db.session.add(new_customer)
-        db.session.commit()
-
-        local_customer_id = new_customer.id
-
-    except Exception as e:
-        db.session.rollback()
-        return jsonify({"error": f"Database error: {str(e)}"}), 500
-
-    # 3. Sync to HubSpot CRM as Contact (via FastAPI service)
-    hubspot_contact_id = None
-    hubspot_error = None
-
-    # Prepare payload for FastAPI CRM service
+    # 3. Queue the HubSpot Contact sync (via FastAPI service) in the same transaction
     crm_payload = {
         "email": validated.email,
         "firstname": validated.firstname,
@@ -71,46 +95,29 @@ def create_customer():
     }
 
     try:
-        # Call FastAPI CRM Integration Service
-        response = requests.post(
-            CUSTOMER_SERVICE_URL,
-            json=crm_payload,
-            timeout=10
-        )
-
-        if response.status_code == 201:
-            crm_data = response.json()
-            hubspot_contact_id = crm_data.get('hubspot_contact_id')
-        else:
-            # Log error but don't fail the request
-            hubspot_error = f"HubSpot sync failed: {response.text}"
-            print(f"Warning: {hubspot_error}")
-
-    except requests.exceptions.ConnectionError:
-        hubspot_error = "CRM Integration Service is not running on port 8000"
-        print(f"Warning: {hubspot_error}")
-    except requests.exceptions.Timeout:
-        hubspot_error = "CRM Integration Service timed out"
-        print(f"Warning: {hubspot_error}")
+        db.session.add(new_customer)
+        db.session.flush()
+        outbox.enqueue('customer.create', crm_payload, customer_id=new_customer.id)
+        etag.bump('customers')
+        events.emit('customer.created', {'id': new_customer.id})
+        db.session.commit()
+
+        local_customer_id = new_customer.id
+
     except Exception as e:
-        hubspot_error = f"CRM sync error: {str(e)}"
-        print(f"Warning: {hubspot_error}")
+        db.session.rollback()
+        return jsonify({"error": f"Database error: {str(e)}"}), 500
 
     # 4. Return success response
     response_data = {
         'message': 'Customer created successfully',
         'customer_id': local_customer_id,
         'saved_to_database': True,
+        # The outbox dispatcher pushes the contact to HubSpot in the background
+        'saved_to_hubspot': False,
+        'crm_sync': 'queued',
     }
 
-    if hubspot_contact_id:
-        response_data['saved_to_hubspot'] = True
-        response_data['hubspot_contact_id'] = hubspot_contact_id
-    else:
-        response_data['saved_to_hubspot'] = False
-        if hubspot_error:
-            response_data['hubspot_warning'] = hubspot_error
-
     return jsonify(response_data), 201
 
 
@@ -152,6 +159,8 @@ def update_customer_by_name(name):
         for key, value in update_dict.items():
             setattr(customer, key, value)
 
+        etag.bump('customers')
+        events.emit('customer.updated', {'id': customer.id})
         db.session.commit()
 
         # Optional: Sync update to HubSpot
@@ -175,7 +184,10 @@ def delete_customer_by_name(name):
         return jsonify({"error": "Customer not found"}), 404
 
     try:
+        customer_id = customer.id
         db.session.delete(customer)
+        etag.bump('customers')
+        events.emit('customer.deleted', {'id': customer_id})
         db.session.commit()
         return jsonify({"message": "Customer deleted from local database"}), 200
     except Exception as e:
@@ -1,32 +1,49 @@
 from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required
-from sqlalchemy import func
 from backend import db
-from backend.models import Tickets, Customers
+from backend.models import Customers, CustomerTicketCounts
+from backend.services import cache, etag
+from backend.services.counters import read_counters
 
 dash_bp = Blueprint('dashboard', __name__)
 
+TOP_CUSTOMERS_DEFAULT = 3
+TOP_CUSTOMERS_MAX = 50
+
+
 @dash_bp.route('/api/dashboard/stats', methods=['GET'])
 @jwt_required()
+@etag.conditional('tickets', 'customers')
+@cache.cached('tickets', 'customers')
 def get_dashboard_stats():
-    # 1. Scalar Counts
-    total_tickets = Tickets.query.count()
-    open_tickets = Tickets.query.filter(Tickets.status != 'Closed').count()
-    closed_tickets = Tickets.query.filter_by(status='Closed').count()
-    high_priority = Tickets.query.filter(Tickets.priority == 'High', Tickets.status != 'Closed').count()
+    try:
+        top_n = min(int(request.args.get('top', TOP_CUSTOMERS_DEFAULT)), TOP_CUSTOMERS_MAX)
+    except ValueError:
+        return jsonify({'error': 'top must be an integer'}), 400
+    if top_n < 0:
+        return jsonify({'error': 'top must not be negative'}), 400
 
+    # 1. Scalar Counts, read from the materialized counters (see services/counters.py)
+    counters = read_counters()
+    total_tickets = counters.get('total', 0)
+    closed_tickets = counters.get('status:Closed', 0)
+    open_tickets = total_tickets - closed_tickets
+    high_priority = counters.get('open_priority:High', 0)
+
+    # 2. Top customers, served from the indexed per-customer totals
     top_customers_query = db.session.query(
         Customers.firstname,
         Customers.lastname,
-        func.count(Tickets.id).label('total')
-    ).join(Tickets, Tickets.customer_id == Customers.id) \
-        .group_by(Customers.id, Customers.firstname, Customers.lastname) \
-        .order_by(func.count(Tickets.id).desc()) \
+        CustomerTicketCounts.total
+    ).join(CustomerTicketCounts, CustomerTicketCounts.customer_id == Customers.id) \
+        .filter(CustomerTicketCounts.total > 0) \
+        .order_by(CustomerTicketCounts.total.desc()) \
+        .limit(top_n) \
         .all()
 
     top_customers = [
         {
-            "name": f"{fname} {lname}".strip(),
+            "name": f"{fname} {lname or ''}".strip(),
             "tickets": count
         }
         for fname, lname, count in top_customers_query
@@ -39,4 +56,3 @@ def get_dashboard_stats():
         "high_priority": high_priority,
         "top_customers": top_customers
     }), 200
-
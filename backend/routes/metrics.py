@@ -0,0 +1,132 @@
+from flask import Blueprint, jsonify, request, Response, current_app
+from flask_jwt_extended import verify_jwt_in_request
+from sqlalchemy import func
+from backend import db
+from backend.models import CrmOutbox
+from backend.services import cache, instrumentation, pool, passwords, login_throttle, identity
+from backend.services.metrics import prometheus_metric, prometheus_histogram
+from backend.services.pool import pool_status
+from backend.services.query_shapes import shapes
+from backend.services.crm import client as crm_client
+from backend.services.pubsub import bus
+
+metrics_bp = Blueprint('metrics', __name__)
+
+
+@metrics_bp.before_request
+def require_login():
+    # Query SQL, login and outbox figures are not for anonymous clients; METRICS_PUBLIC opens
+    # them to a scraper on a private network
+    if not current_app.config['METRICS_PUBLIC']:
+        verify_jwt_in_request()
+
+
+@metrics_bp.route('/api/metrics/crm', methods=['GET'])
+def crm_metrics():
+    """CRM call counts, latency and calls/items per second since start (or last reset)"""
+    return jsonify(crm_client.stats.snapshot()), 200
+
+
+@metrics_bp.route('/api/metrics/cache', methods=['GET'])
+def cache_metrics():
+    """Response cache hits/misses per endpoint"""
+    return jsonify({
+        'backend': type(cache.store).__name__,
+        'entries': len(cache.store),
+        'endpoints': cache.stats.snapshot(),
+    }), 200
+
+
+@metrics_bp.route('/api/metrics/stream', methods=['GET'])
+def stream_metrics():
+    """Live update bus: connected subscribers, published and dropped events, refused streams"""
+    return jsonify(bus.stats()), 200
+
+
+@metrics_bp.route('/api/metrics/pool', methods=['GET'])
+def pool_metrics():
+    """DB connection pool occupancy, churn, checkout wait and hold time histograms"""
+    return jsonify(pool_status(db.engine)), 200
+
+
+@metrics_bp.route('/api/metrics/auth', methods=['GET'])
+def auth_metrics():
+    """Password hashing, failed login throttle and token/user cache counts"""
+    return jsonify({
+        'passwords': passwords.stats(),
+        'login_throttle': login_throttle.stats(),
+        'identity': identity.stats(),
+    }), 200
+
+
+@metrics_bp.route('/api/metrics/queries', methods=['GET'])
+def query_metrics():
+    """SQL query shapes with the most total time: calls, total/avg/max ms (?top=, default 50)"""
+    top = min(request.args.get('top', 50, type=int), 500)
+    return jsonify(shapes.snapshot(top)), 200
+
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Everything above plus per-endpoint latency/SQL/CRM histograms, in Prometheus text format"""
+    lines = []
+    lines += prometheus_histogram('ssd_http_request_duration_seconds', 'Request latency up to the first byte.',
+                                  instrumentation.request_seconds.series())
+    lines += prometheus_histogram('ssd_http_request_db_seconds', 'Total SQL time per request.',
+                                  instrumentation.request_db_seconds.series())
+    lines += prometheus_histogram('ssd_http_request_db_statements', 'SQL statements per request.',
+                                  instrumentation.request_db_statements.series())
+    lines += prometheus_histogram('ssd_crm_call_duration_seconds', 'CRM service call latency.',
+                                  instrumentation.crm_seconds.series())
+
+    operations = crm_client.stats.snapshot()['operations']
+    lines += prometheus_metric('ssd_crm_calls_total', 'counter', 'CRM service calls.',
+                               [({'operation': op}, stats['calls']) for op, stats in sorted(operations.items())])
+    lines += prometheus_metric('ssd_crm_errors_total', 'counter', 'Failed CRM service calls.',
+                               [({'operation': op}, stats['errors']) for op, stats in sorted(operations.items())])
+    backlog = dict(db.session.query(CrmOutbox.status, func.count()).group_by(CrmOutbox.status).all())
+    lines += prometheus_metric('ssd_crm_outbox_rows', 'gauge', 'CRM outbox rows by status.',
+                               [({'status': status}, backlog.get(status, 0)) for status in ('pending', 'failed')])
+
+    status = pool_status(db.engine)
+    lines += prometheus_metric('ssd_db_pool_checked_out', 'gauge', 'DB connections in use.',
+                               [({}, status.get('checked_out', 0))])
+    lines += prometheus_metric('ssd_db_pool_overflow', 'gauge', 'DB connections open beyond pool_size.',
+                               [({}, status.get('overflow', 0))])
+    for name in ('connects', 'checkouts', 'invalidations', 'timeouts'):
+        lines += prometheus_metric(f'ssd_db_pool_{name}_total', 'counter', f'DB pool {name}.', [({}, status[name])])
+    lines += prometheus_histogram('ssd_db_pool_checkout_wait_seconds', 'Wait for a free DB connection.',
+                                  [({}, pool.checkout_wait)])
+    lines += prometheus_histogram('ssd_db_pool_hold_seconds', 'Time a DB connection stays checked out.',
+                                  [({}, pool.hold_time)])
+
+    endpoints = cache.stats.snapshot()
+    lines += prometheus_metric('ssd_cache_hits_total', 'counter', 'Response cache hits.',
+                               [({'endpoint': ep}, stats['hits']) for ep, stats in sorted(endpoints.items())])
+    lines += prometheus_metric('ssd_cache_misses_total', 'counter', 'Response cache misses.',
+                               [({'endpoint': ep}, stats['misses']) for ep, stats in sorted(endpoints.items())])
+
+    stream = bus.stats()
+    lines += prometheus_metric('ssd_stream_subscribers', 'gauge', 'Connected live update subscribers.',
+                               [({}, stream['subscribers'])])
+    lines += prometheus_metric('ssd_stream_events_dropped_total', 'counter', 'Live update events dropped for slow subscribers.',
+                               [({}, stream['dropped'])])
+    lines += prometheus_metric('ssd_stream_rejected_total', 'counter', 'Live update streams refused over SSE_MAX_STREAMS.',
+                               [({}, stream['rejected'])])
+
+    hashing = passwords.counters.snapshot()
+    lines += prometheus_metric('ssd_password_hashes_total', 'counter', 'Password hash operations by outcome.',
+                               [({'outcome': name}, hashing[name]) for name in ('hashes', 'verifications', 'failures',
+                                                                                'rehashes', 'busy')])
+    lines += prometheus_histogram('ssd_password_hash_seconds', 'Password hash/verify latency, queueing included.',
+                                  [({}, passwords.hash_seconds)])
+    throttle = login_throttle.counters.snapshot()
+    lines += prometheus_metric('ssd_login_throttled_total', 'counter', 'Login attempts refused by the failure throttle.',
+                               [({}, throttle['throttled'])])
+    cached = identity.counters.snapshot()
+    lines += prometheus_metric('ssd_identity_cache_hits_total', 'counter', 'Token claims and user lookups served from cache.',
+                               [({'kind': kind}, cached[f'{kind}_hits']) for kind in ('claims', 'user')])
+    lines += prometheus_metric('ssd_identity_cache_misses_total', 'counter', 'Token claims decoded and users loaded from the DB.',
+                               [({'kind': kind}, cached[f'{kind}_misses']) for kind in ('claims', 'user')])
+
+    return Response('\n'.join(lines) + '\n', mimetype='text/plain; version=0.0.4'), 200
@@ -0,0 +1,107 @@
+from flask import Blueprint, Response, current_app, jsonify, request
+from flask_jwt_extended import jwt_required
+from backend.services import etag
+from backend.services.pubsub import bus, format_sse
+
+stream_bp = Blueprint('stream', __name__)
+
+HEARTBEAT_SECONDS = 15
+MAX_POLL_SECONDS = 60
+
+
+def resync_event():
+    return {'id': bus.last_id(), 'event': 'resync', 'data': {}}
+
+
+@stream_bp.route('/api/stream/tickets', methods=['GET'])
+@jwt_required()
+def ticket_stream():
+    """
+    Server-Sent Events stream of ticket changes (ticket.created, ticket.updated,
+    ticket.deleted, tickets.imported). Reconnects resume from Last-Event-ID; a
+    'resync' event means some events were missed and the client should refetch.
+
+    Each open stream holds one of the server's request threads, so at most
+    SSE_MAX_STREAMS are served per process; past that the answer is 503 and
+    the client should long-poll /api/stream/poll instead.
+    """
+    try:
+        last_event_id = int(request.headers.get('Last-Event-ID') or request.args.get('after') or 0)
+    except ValueError:
+        return jsonify({'error': 'Invalid Last-Event-ID'}), 400
+
+    # Subscribe before reading the backlog so nothing published in between is lost
+    subscription = bus.subscribe(current_app.config['SSE_MAX_STREAMS'])
+    if subscription is None:
+        response = jsonify({'error': 'Too many live streams on this server', 'poll': '/api/stream/poll'})
+        response.headers['Retry-After'] = str(HEARTBEAT_SECONDS)
+        return response, 503
+    backlog = bus.since(last_event_id) if last_event_id else []
+
+    def generate():
+        last_sent = last_event_id
+        try:
+            yield "retry: 3000\n\n"
+            if backlog is None:
+                event = resync_event()
+                last_sent = event['id']
+                yield format_sse(event)
+            else:
+                for event in backlog:
+                    last_sent = event['id']
+                    yield format_sse(event)
+
+            while True:
+                event = subscription.get(timeout=HEARTBEAT_SECONDS)
+                if subscription.overflowed:
+                    subscription.overflowed = False
+                    yield format_sse(resync_event())
+                if event is None:
+                    # Comment line keeps proxies from closing the connection and detects gone clients
+                    yield ": keep-alive\n\n"
+                    continue
+                if event['id'] <= last_sent:
+                    continue
+                last_sent = event['id']
+                yield format_sse(event)
+        finally:
+            subscription.close()
+
+    response = Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',
+    })
+    # generate()'s finally never runs if the client leaves before the first chunk
+    response.call_on_close(subscription.close)
+    return response
+
+
+@stream_bp.route('/api/stream/poll', methods=['GET'])
+@jwt_required()
+def poll_events():
+    """
+    Long-poll alternative to the SSE stream: waits up to ?timeout= seconds
+    (default 25, 0 returns immediately) for events newer than ?after=.
+
+    Event ids are per process, so behind several workers consecutive polls
+    can see different ids. 'version' is the tickets table version from the
+    database, the same on every worker: clients that only need to know
+    whether tickets changed should compare that instead.
+    """
+    try:
+        after = int(request.args.get('after', 0))
+        timeout = max(0.0, min(float(request.args.get('timeout', 25)), MAX_POLL_SECONDS))
+    except ValueError:
+        return jsonify({'error': 'after and timeout must be numbers'}), 400
+
+    events = bus.wait(after, timeout)
+    version = etag.versions(('tickets',))['tickets']
+    if events is None:
+        return jsonify({'resync': True, 'events': [], 'last_id': bus.last_id(), 'version': version}), 200
+
+    return jsonify({
+        'resync': False,
+        'events': events,
+        'last_id': events[-1]['id'] if events else after,
+        'version': version,
+    }), 200
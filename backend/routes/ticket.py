@@ -1,48 +1,279 @@
-import requests
-from flask import Blueprint, request, jsonify
+import json
+from datetime import datetime
+from flask import Blueprint, request, jsonify, Response, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import and_, or_, func
 from backend import db
-from backend.models import Tickets, Customers
-from backend import CRM_SERVICE_URL
+from backend.models import Tickets, Customers, TicketTombstones
+from backend.services import cache, etag, events, outbox, search
+from backend.services.counters import record_ticket_change, ticket_dimensions
 ticket_bp = Blueprint('ticket', __name__)
 
+MAX_PAGE_SIZE = 1000
+STREAM_BATCH_SIZE = 1000
+SORT_KEYS = ('id', 'updated_at')
+SORT_ORDERS = ('asc', 'desc')
+
+
+def ticket_list_query():
+    """Tickets joined with their customer's columns in one SELECT, returned as plain rows"""
+    return db.session.query(
+        Tickets.id,
+        Tickets.title,
+        Tickets.description,
+        Tickets.status,
+        Tickets.priority,
+        Tickets.customer_id,
+        Tickets.updated_at,
+        Customers.firstname.label('customer_firstname'),
+        Customers.lastname.label('customer_lastname'),
+        Customers.email.label('customer_email'),
+    ).outerjoin(Customers, Customers.id == Tickets.customer_id)
+
+
+def serialize_ticket(row):
+    has_customer = row.customer_email is not None
+    return {
+        'id': row.id,
+        'title': row.title,
+        'description': row.description,
+        'status': row.status,
+        'priority': row.priority,
+        'customer_id': row.customer_id,
+        'customer_name': row.customer_firstname or row.customer_lastname if has_customer else "Unknown",
+        'customer_email': row.customer_email if has_customer else ""
+    }
+
+
+def encode_cursor(t, sort):
+    """Cursor is the last id seen, or '<updated_at iso>|<id>' when sorting by updated_at"""
+    if sort == 'updated_at':
+        return f"{t.updated_at.isoformat()}|{t.id}"
+    return str(t.id)
+
+
+def apply_cursor(query, after, sort, descending=False):
+    if sort == 'updated_at':
+        ts, _, last_id = after.partition('|')
+        ts, last_id = datetime.fromisoformat(ts), int(last_id)
+        if descending:
+            return query.filter(or_(
+                Tickets.updated_at < ts,
+                and_(Tickets.updated_at == ts, Tickets.id < last_id)
+            ))
+        return query.filter(or_(
+            Tickets.updated_at > ts,
+            and_(Tickets.updated_at == ts, Tickets.id > last_id)
+        ))
+    if descending:
+        return query.filter(Tickets.id < int(after))
+    return query.filter(Tickets.id > int(after))
+
+
 @ticket_bp.route('/api/view_tickets', methods=['GET'])
 @jwt_required()
+@etag.conditional('tickets', 'customers')
+@cache.cached('tickets', 'customers')
 def view_tickets():
+    """
+    List tickets ordered by a keyset (id, or updated_at + id).
+
+    Query params:
+        status, priority: comma separated filters
+        sort: 'id' (default) or 'updated_at'
+        order: 'asc' (default) or 'desc'
+        limit: page size (max 1000); the next page cursor is returned in X-Next-Cursor
+        after: cursor returned by the previous page
+        count: 'true' adds the number of matching tickets in X-Total-Count (paged requests only)
+        format: 'ndjson' streams rows one per line instead of a JSON list
+    Without limit every matching row is returned as one JSON list, as before.
+    """
     status = request.args.get('status')
     priority = request.args.get('priority')
+    sort = request.args.get('sort', 'id')
+    order = request.args.get('order', 'asc')
+    after = request.args.get('after')
+    limit = request.args.get('limit')
+    output_format = request.args.get('format', 'json')
+
+    if sort not in SORT_KEYS:
+        return jsonify({'error': f"sort must be one of {', '.join(SORT_KEYS)}"}), 400
+    if order not in SORT_ORDERS:
+        return jsonify({'error': f"order must be one of {', '.join(SORT_ORDERS)}"}), 400
+    descending = order == 'desc'
 
-    query = Tickets.query
+    try:
+        limit = min(int(limit), MAX_PAGE_SIZE) if limit else None
+    except ValueError:
+        return jsonify({'error': 'limit must be an integer'}), 400
+    if limit is not None and limit < 1:
+        return jsonify({'error': 'limit must be positive'}), 400
 
+    filters = []
     if status:
-        status_list = status.split(',')
-        query = query.filter(Tickets.status.in_(status_list))
-
+        filters.append(Tickets.status.in_(status.split(',')))
     if priority:
-        priority_list = priority.split(',')
-        query = query.filter(Tickets.priority.in_(priority_list))
-
-    tickets = query.all()
-
-    output = []
-    for t in tickets:
-        display_name = "Unknown"
-        if t.customer:
-            fname = t.customer.firstname or ""
-            lname = t.customer.lastname or ""
-            display_name = f"{fname} {lname}".strip() or t.customer.email
-        output.append({
-            'id': t.id,
-            'title': t.title,
-            'description': t.description,
-            'status': t.status,
-            'priority': t.priority,
-            'customer_id': t.customer_id,
-            'customer_name': t.customer.firstname or t.customer.lastname if t.customer else "Unknown",
-            'customer_email': t.customer.email if t.customer else ""
-        })
-
-    return jsonify(output), 200
+        filters.append(Tickets.priority.in_(priority.split(',')))
+    query = ticket_list_query().filter(*filters)
+
+    # Tickets alone, without the cursor, so every page reports the same total
+    total = None
+    if limit and request.args.get('count', 'false').lower() == 'true':
+        total = db.session.query(func.count(Tickets.id)).filter(*filters).scalar()
+
+    if after:
+        try:
+            query = apply_cursor(query, after, sort, descending)
+        except ValueError:
+            return jsonify({'error': 'Invalid cursor'}), 400
+
+    keys = (Tickets.updated_at, Tickets.id) if sort == 'updated_at' else (Tickets.id,)
+    query = query.order_by(*(key.desc() if descending else key for key in keys))
+
+    if output_format == 'ndjson':
+        if limit:
+            query = query.limit(limit)
+
+        # yield_per streams from a server-side cursor, so only one batch is held in memory
+        def generate():
+            for t in query.yield_per(STREAM_BATCH_SIZE):
+                yield json.dumps(serialize_ticket(t)) + "\n"
+
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+    if limit is None:
+        tickets = query.all()
+        return jsonify([serialize_ticket(t) for t in tickets]), 200
+
+    # Fetch one extra row to know whether another page exists
+    tickets = query.limit(limit + 1).all()
+    has_more = len(tickets) > limit
+    tickets = tickets[:limit]
+
+    response = jsonify([serialize_ticket(t) for t in tickets])
+    if has_more:
+        response.headers['X-Next-Cursor'] = encode_cursor(tickets[-1], sort)
+    if total is not None:
+        response.headers['X-Total-Count'] = str(total)
+    return response, 200
+
+
+@ticket_bp.route('/api/tickets/search', methods=['GET'])
+@jwt_required()
+def search_tickets():
+    """
+    Ranked full-text search over ticket title and description.
+
+    Query params: q (required), limit (default 20, max 1000), offset.
+    Each result carries a 'score'; higher is a better match.
+    """
+    q = request.args.get('q', '').strip()
+    if not q:
+        return jsonify({'error': 'q is required'}), 400
+
+    try:
+        limit = min(int(request.args.get('limit', 20)), MAX_PAGE_SIZE)
+        offset = max(int(request.args.get('offset', 0)), 0)
+    except ValueError:
+        return jsonify({'error': 'limit and offset must be integers'}), 400
+    if limit < 1:
+        return jsonify({'error': 'limit must be positive'}), 400
+
+    # Fetch one extra id to know whether another page exists
+    ranked = search.search_ids(q, limit + 1, offset)
+    has_more = len(ranked) > limit
+    ranked = ranked[:limit]
+
+    scores = dict(ranked)
+    rows = {row.id: row for row in ticket_list_query().filter(Tickets.id.in_(scores))} if scores else {}
+
+    results = []
+    for ticket_id, score in ranked:
+        if ticket_id in rows:
+            item = serialize_ticket(rows[ticket_id])
+            item['score'] = score
+            results.append(item)
+
+    return jsonify({
+        'results': results,
+        'limit': limit,
+        'offset': offset,
+        'next_offset': offset + limit if has_more else None,
+    }), 200
+
+
+def parse_watermark(since):
+    """(change_seq, last id or None); a bare change_seq means everything up to it was returned"""
+    seq, _, last_id = since.partition('|')
+    return int(seq), int(last_id) if last_id else None
+
+
+@ticket_bp.route('/api/tickets/changes', methods=['GET'])
+@jwt_required()
+def ticket_changes():
+    """
+    Tickets inserted/updated, and ids deleted, since a watermark.
+
+    Query params:
+        since: watermark returned by the previous call; omit it for a full sync
+        limit: max changed rows per call (default and max 1000)
+    Keep calling with the returned watermark while has_more is true. Deleted
+    ids may be repeated across calls, so clients should treat them idempotently.
+    Customer renames don't touch tickets and are not reported here.
+
+    Every ticket write stores the change sequence it took from the tickets
+    data version (etag.next_change), which increases in commit order, so the
+    watermark never passes a write that has yet to commit.
+    """
+    since = request.args.get('since')
+    try:
+        limit = min(int(request.args.get('limit', MAX_PAGE_SIZE)), MAX_PAGE_SIZE)
+    except ValueError:
+        return jsonify({'error': 'limit must be an integer'}), 400
+    if limit < 1:
+        return jsonify({'error': 'limit must be positive'}), 400
+
+    since_seq = last_id = None
+    if since:
+        try:
+            since_seq, last_id = parse_watermark(since)
+        except ValueError:
+            return jsonify({'error': 'Invalid watermark'}), 400
+
+    # Every write numbered up to the current version has committed; later ones wait for the next call
+    upto = etag.versions(('tickets',))['tickets']
+
+    query = ticket_list_query().add_columns(Tickets.change_seq).filter(Tickets.change_seq <= upto)
+    if since_seq is not None and last_id is None:
+        query = query.filter(Tickets.change_seq > since_seq)
+    elif since_seq is not None:
+        query = query.filter(or_(
+            Tickets.change_seq > since_seq,
+            and_(Tickets.change_seq == since_seq, Tickets.id > last_id)
+        ))
+
+    rows = query.order_by(Tickets.change_seq, Tickets.id).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    # Deletes up to the page we stopped at; the rest come with the next page
+    reported_upto = rows[-1].change_seq if has_more else upto
+    deleted = []
+    if since_seq is not None:
+        deleted = [
+            ticket_id for (ticket_id,) in
+            db.session.query(TicketTombstones.ticket_id)
+            .filter(TicketTombstones.change_seq > since_seq, TicketTombstones.change_seq <= reported_upto)
+        ]
+
+    watermark = f"{rows[-1].change_seq}|{rows[-1].id}" if has_more else str(upto)
+
+    return jsonify({
+        'changes': [serialize_ticket(row) for row in rows],
+        'deleted': deleted,
+        'watermark': watermark,
+        'has_more': has_more,
+    }), 200
 
 
 @ticket_bp.route('/api/add_tickets', methods=['POST'])
@@ -69,23 +300,8 @@ def add_ticket():
         customer_id=data['customer_id']
     )
 
-    try:
-        db.session.add(new_ticket)
-        db.session.commit()
-
-        local_ticket_id = new_ticket.id
-
-    except Exception as e:
-        db.session.rollback()
-        return jsonify({'error': f'Database error: {str(e)}'}), 500
-
-    # 4. Sync to HubSpot CRM (via FastAPI service)
+    # 4. Queue the HubSpot CRM sync (via FastAPI service) in the same transaction
     # Now we use the customer's email to link the ticket to the contact
-    hubspot_ticket_id = None
-    hubspot_error = None
-    linked_to_contact = False
-
-    # Prepare payload for FastAPI CRM service
     crm_payload = {
         "title": data['title'],
         "description": data.get('description', 'No description provided'),
@@ -97,31 +313,20 @@ def add_ticket():
     }
 
     try:
-        # Call FastAPI CRM Integration Service
-        response = requests.post(
-            CRM_SERVICE_URL,
-            json=crm_payload,
-            timeout=10
-        )
-
-        if response.status_code == 201:
-            crm_data = response.json()
-            hubspot_ticket_id = crm_data.get('hubspot_ticket_id')
-            linked_to_contact = crm_data.get('linked_to_contact', False)
-        else:
-            # Log error but don't fail the request
-            hubspot_error = f"HubSpot sync failed: {response.text}"
-            print(f"Warning: {hubspot_error}")
-
-    except requests.exceptions.ConnectionError:
-        hubspot_error = "CRM Integration Service is not running on port 8000"
-        print(f"Warning: {hubspot_error}")
-    except requests.exceptions.Timeout:
-        hubspot_error = "CRM Integration Service timed out"
-        print(f"Warning: {hubspot_error}")
+        db.session.add(new_ticket)
+        db.session.flush()
+        record_ticket_change(None, ticket_dimensions(new_ticket))
+        outbox.enqueue('ticket.create', crm_payload, ticket_id=new_ticket.id, customer_id=customer.id)
+        new_ticket.change_seq = etag.next_change('tickets')
+        events.emit('ticket.created', {'id': new_ticket.id, 'status': new_ticket.status,
+                                       'priority': new_ticket.priority})
+        db.session.commit()
+
+        local_ticket_id = new_ticket.id
+
     except Exception as e:
-        hubspot_error = f"CRM sync error: {str(e)}"
-        print(f"Warning: {hubspot_error}")
+        db.session.rollback()
+        return jsonify({'error': f'Database error: {str(e)}'}), 500
 
     # 5. Return success response
     response_data = {
@@ -131,17 +336,11 @@ def add_ticket():
         'customer_email': customer.email,
         'customer_firstname': customer.firstname,
         'customer_lastname': customer.lastname,
+        # The outbox dispatcher pushes the ticket to HubSpot in the background
+        'saved_to_hubspot': False,
+        'crm_sync': 'queued',
     }
 
-    if hubspot_ticket_id:
-        response_data['saved_to_hubspot'] = True
-        response_data['hubspot_ticket_id'] = hubspot_ticket_id
-        response_data['linked_to_contact'] = linked_to_contact
-    else:
-        response_data['saved_to_hubspot'] = False
-        if hubspot_error:
-            response_data['hubspot_warning'] = hubspot_error
-
     return jsonify(response_data), 201
 
 
@@ -155,6 +354,7 @@ def update_ticket(ticket_id):
         return jsonify({'message': 'Ticket not found'}), 404
 
     data = request.get_json()
+    before = ticket_dimensions(ticket)
 
     try:
         ticket.title = data.get('title', ticket.title)
@@ -172,20 +372,21 @@ def update_ticket(ticket_id):
             else:
                 return jsonify({'error': 'Customer not found'}), 404
 
+        record_ticket_change(before, ticket_dimensions(ticket))
+
+        # 2. Queue the HubSpot sync; the dispatcher resolves the HubSpot ID when it sends
+        hubspot_payload = {
+            "title": ticket.title,
+            "description": ticket.description,
+            "priority": ticket.priority,
+            "status": ticket.status
+        }
+        outbox.enqueue('ticket.update', hubspot_payload, ticket_id=ticket.id)
+        ticket.change_seq = etag.next_change('tickets')
+        events.emit('ticket.updated', {'id': ticket.id, 'status': ticket.status, 'priority': ticket.priority})
+        db.session.commit()
 
-            db.session.commit()
-
-            # 2. Sync to HubSpot if a HubSpot ID exists
-            if ticket.hubspot_ticket_id:
-                hubspot_payload = {
-                    "title": ticket.title,
-                    "description": ticket.description,
-                    "priority": ticket.priority,
-                    "status": ticket.status
-                }
-                crm_url = f"http://localhost:8000/integrate/ticket/{ticket.hubspot_ticket_id}"
-                requests.patch(crm_url, json=hubspot_payload, timeout=5)
-            return jsonify({"message": "Ticket updated locally and synced to CRM"}), 200
+        return jsonify({"message": "Ticket updated locally, CRM sync queued"}), 200
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -201,7 +402,11 @@ def delete_ticket(ticket_id):
         return jsonify({'error': 'Ticket not found'}), 404
 
     try:
+        record_ticket_change(ticket_dimensions(ticket), None)
+        db.session.merge(TicketTombstones(ticket_id=ticket.id, deleted_at=datetime.utcnow(),
+                                          change_seq=etag.next_change('tickets')))
         db.session.delete(ticket)
+        events.emit('ticket.deleted', {'id': ticket_id})
         db.session.commit()
         return jsonify({'message': 'Ticket deleted successfully'}), 200
     except Exception as e:
@@ -1,3 +1,3 @@
 from .customer import CustomerCreateSchema, CustomerUpdateSchema
 from .user import UserRegisterSchema, UserLoginSchema
-from .ticket import TicketCreateSchema, TicketUpdateSchema
\ No newline at end of file
+from .ticket import TicketCreateSchema, TicketUpdateSchema, TicketImportSchema
\ No newline at end of file
@@ -26,4 +26,9 @@ class TicketUpdateSchema(BaseModel):
     priority: Optional[ALLOWED_PRIORITIES] = None
     category: Optional[ALLOWED_CATEGORIES] = None
     customer_id: Optional[int] = None
-    assigned_to_id: Optional[int] = None
\ No newline at end of file
+    assigned_to_id: Optional[int] = None
+
+class TicketImportSchema(TicketCreateSchema):
+    """Row of a bulk import; historical tickets may carry their status"""
+    status: ALLOWED_STATUSES = 'Open'
+    category: ALLOWED_CATEGORIES = 'General'
@@ -0,0 +1,65 @@
+"""
+Streaming readers for bulk imports.
+
+Uploads are parsed straight off the request stream one record at a time,
+so an import never holds the whole file in memory.
+"""
+import csv
+import io
+import json
+from itertools import islice
+
+CSV_TYPES = ('text/csv', 'application/csv')
+NDJSON_TYPES = ('application/x-ndjson', 'application/ndjson', 'application/jsonlines')
+
+
+def detect_format(content_type, requested=None):
+    if requested in ('csv', 'ndjson'):
+        return requested
+    mimetype = (content_type or '').split(';')[0].strip().lower()
+    if mimetype in CSV_TYPES:
+        return 'csv'
+    if mimetype in NDJSON_TYPES:
+        return 'ndjson'
+    return None
+
+
+def iter_records(stream, fmt):
+    """
+    Yield (row_number, record, error) for every row of the upload.
+    row_number is 1-based over data rows (the CSV header is not counted).
+    """
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+
+    if fmt == 'csv':
+        for row_number, record in enumerate(csv.DictReader(text), start=1):
+            # Empty cells mean "not provided" so schema defaults apply
+            yield row_number, {k: v for k, v in record.items() if k and v not in ('', None)}, None
+        return
+
+    row_number = 0
+    for line in text:
+        if not line.strip():
+            continue
+        row_number += 1
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield row_number, None, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(record, dict):
+            yield row_number, None, "Each line must be a JSON object"
+            continue
+        yield row_number, record, None
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def validation_message(error):
+    first = error.errors()[0]
+    field = '.'.join(str(part) for part in first['loc'])
+    return f"{field}: {first['msg']}" if field else first['msg']
@@ -0,0 +1,200 @@
+"""
+Server-side response cache for read endpoints.
+
+Responses are cached per endpoint + normalized query string. Every key
+also embeds the data_versions of the tables the endpoint reads ('tickets',
+'customers'), the same versions its ETag is made from (etag.read_versions,
+read once per request). Writes bump them in their own transaction, so
+once a write commits every worker stops matching the entries that read
+that table, and a response is never served under a newer ETag than the
+data it holds. Entries also expire after CACHE_TTL seconds.
+
+The store is an in-process LRU by default. Set CACHE_REDIS_URL to share it
+between worker processes through a Redis-compatible server.
+"""
+import heapq
+import json
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from functools import wraps
+from flask import request, current_app, Response
+from backend import app
+from backend.services.etag import normalized_args, read_versions
+
+CACHED_HEADERS = ('X-Next-Cursor', 'X-Total-Count')
+
+
+class LRUCache:
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires = item
+            if expires is not None and expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class ExpiringCache:
+    """
+    Same interface as LRUCache, but with no size cap: an entry is only ever
+    dropped once its ttl has run out (expired entries are purged as new ones
+    arrive). For data that must not be forgotten early, like revoked tokens.
+    """
+
+    def __init__(self):
+        self._data = {}
+        self._expiry = []  # heap of (expires, key)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires = item
+            if expires is not None and expires < time.monotonic():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key, value, ttl=None):
+        now = time.monotonic()
+        expires = now + ttl if ttl else None
+        with self._lock:
+            while self._expiry and self._expiry[0][0] < now:
+                _, old_key = heapq.heappop(self._expiry)
+                item = self._data.get(old_key)
+                # The key may have been set again with a later expiry since
+                if item is not None and item[1] is not None and item[1] < now:
+                    del self._data[old_key]
+            self._data[key] = (value, expires)
+            if expires is not None:
+                heapq.heappush(self._expiry, (expires, key))
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._expiry.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class RedisCache:
+    def __init__(self, url):
+        import redis
+        self.client = redis.Redis.from_url(url)
+
+    def get(self, key):
+        value = self.client.get(key)
+        return value.decode() if value is not None else None
+
+    def set(self, key, value, ttl=None):
+        self.client.set(key, value, ex=int(ttl) if ttl else None)
+
+    def delete(self, key):
+        self.client.delete(key)
+
+    def clear(self):
+        for key in self.client.scan_iter('ssd:resp:*'):
+            self.client.delete(key)
+
+    def __len__(self):
+        return sum(1 for _ in self.client.scan_iter('ssd:resp:*'))
+
+
+class CacheStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = defaultdict(int)
+        self.misses = defaultdict(int)
+
+    def record(self, endpoint, hit):
+        with self._lock:
+            (self.hits if hit else self.misses)[endpoint] += 1
+
+    def snapshot(self):
+        with self._lock:
+            endpoints = set(self.hits) | set(self.misses)
+            return {
+                endpoint: {
+                    'hits': self.hits[endpoint],
+                    'misses': self.misses[endpoint],
+                    'hit_ratio': round(self.hits[endpoint] / (self.hits[endpoint] + self.misses[endpoint]), 3),
+                }
+                for endpoint in endpoints
+            }
+
+
+def create_store(config):
+    if config['CACHE_REDIS_URL']:
+        return RedisCache(config['CACHE_REDIS_URL'])
+    return LRUCache(config['CACHE_MAX_ENTRIES'])
+
+
+store = create_store(app.config)
+stats = CacheStats()
+
+
+def cached(*namespaces):
+    """Cache successful JSON responses of a view; namespaces are the data it reads"""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if not current_app.config['CACHE_ENABLED']:
+                return view(*args, **kwargs)
+
+            versions = ','.join(read_versions(namespaces))
+            key = f'ssd:resp:{request.path}?{normalized_args()}#{versions}'
+
+            entry = store.get(key)
+            if entry is not None:
+                stats.record(request.endpoint, hit=True)
+                entry = json.loads(entry)
+                response = Response(entry['body'], status=200, mimetype='application/json', headers=entry['headers'])
+                response.headers['X-Cache'] = 'HIT'
+                return response
+
+            stats.record(request.endpoint, hit=False)
+            response = current_app.make_response(view(*args, **kwargs))
+            if response.status_code == 200 and not response.is_streamed and response.is_json:
+                headers = {h: response.headers[h] for h in CACHED_HEADERS if h in response.headers}
+                entry = json.dumps({'body': response.get_data(as_text=True), 'headers': headers})
+                store.set(key, entry, current_app.config['CACHE_TTL'])
+            response.headers['X-Cache'] = 'MISS'
+            return response
+        return wrapper
+    return decorator
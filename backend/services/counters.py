@@ -0,0 +1,158 @@
+"""
+Materialized ticket counters.
+
+The dashboard reads these instead of aggregating over tickets. Every write
+that changes a ticket's status, priority or customer must call
+record_ticket_change() before committing, so the counters move in the same
+transaction as the ticket itself.
+`flask init-db` fills them from the tickets table while they are empty, and
+`flask counters rebuild` recounts them at any time.
+"""
+from collections import Counter
+from sqlalchemy import func, insert, update
+from sqlalchemy.dialects import mysql, sqlite
+from backend import db
+from backend.models import Tickets, TicketCounters, CustomerTicketCounts
+
+
+def ticket_dimensions(ticket):
+    return ticket.status, ticket.priority, ticket.customer_id
+
+
+# Spelling the dashboard reads; the update route stores priorities upper-cased ('HIGH') and MySQL
+# compares them case-insensitively, so counters fold every spelling into one name
+CANONICAL_STATUSES = {name.lower(): name for name in ('Open', 'In Progress', 'Closed')}
+CANONICAL_PRIORITIES = {name.lower(): name for name in ('Low', 'Medium', 'High')}
+
+
+def canonical(value, spellings):
+    return spellings.get(value.lower(), value) if isinstance(value, str) else value
+
+
+def counter_names(status, priority):
+    status = canonical(status, CANONICAL_STATUSES)
+    priority = canonical(priority, CANONICAL_PRIORITIES)
+    names = ['total', f'status:{status}', f'priority:{priority}']
+    if status != 'Closed':
+        names.append(f'open_priority:{priority}')
+    return names
+
+
+def record_ticket_change(before, after):
+    """
+    before/after are ticket_dimensions() tuples; pass None for before on
+    create and None for after on delete.
+    """
+    deltas = Counter()
+    customer_deltas = Counter()
+
+    if before:
+        status, priority, customer_id = before
+        deltas.subtract(counter_names(status, priority))
+        customer_deltas[customer_id] -= 1
+
+    if after:
+        status, priority, customer_id = after
+        deltas.update(counter_names(status, priority))
+        customer_deltas[customer_id] += 1
+
+    apply_deltas(deltas, customer_deltas)
+
+
+def record_ticket_inserts(dimensions):
+    """Apply a batch of new tickets (ticket_dimensions() tuples) with one statement per counter"""
+    deltas = Counter()
+    customer_deltas = Counter()
+    for status, priority, customer_id in dimensions:
+        deltas.update(counter_names(status, priority))
+        customer_deltas[customer_id] += 1
+    apply_deltas(deltas, customer_deltas)
+
+
+def apply_deltas(deltas, customer_deltas):
+    # Sorted so concurrent writers lock counter rows in the same order
+    for name in sorted(deltas):
+        if deltas[name]:
+            increment(TicketCounters, {'name': name}, 'value', deltas[name])
+
+    for customer_id in sorted(customer_deltas):
+        if customer_deltas[customer_id]:
+            increment(CustomerTicketCounts, {'customer_id': customer_id}, 'total', customer_deltas[customer_id])
+
+
+def increment(model, key, column, delta):
+    """
+    Add delta to column of the row whose primary key is key, creating the row
+    with delta if there is none. One upsert statement where the database has
+    one, so two transactions creating the same row can't both INSERT.
+    """
+    column_attr = getattr(model, column)
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'mysql':
+        db.session.execute(
+            mysql.insert(model).values({**key, column: delta})
+            .on_duplicate_key_update({column: column_attr + delta})
+        )
+    elif dialect == 'sqlite':
+        db.session.execute(
+            sqlite.insert(model).values({**key, column: delta})
+            .on_conflict_do_update(index_elements=list(key), set_={column: column_attr + delta})
+        )
+    else:
+        where = [getattr(model, name) == value for name, value in key.items()]
+        if db.session.execute(update(model).where(*where).values({column: column_attr + delta})).rowcount == 0:
+            db.session.execute(insert(model).values({**key, column: delta}))
+
+
+def read_counters():
+    return {row.name: row.value for row in TicketCounters.query.all()}
+
+
+def compute_from_tickets():
+    """Recount everything from the tickets table (full scan, used by rebuild/verify)"""
+    counters = Counter()
+    rows = db.session.query(Tickets.status, Tickets.priority, func.count(Tickets.id)) \
+        .group_by(Tickets.status, Tickets.priority).all()
+    for status, priority, count in rows:
+        for name in counter_names(status, priority):
+            counters[name] += count
+
+    customers = dict(
+        db.session.query(Tickets.customer_id, func.count(Tickets.id))
+        .group_by(Tickets.customer_id).all()
+    )
+    return counters, customers
+
+
+def rebuild():
+    counters, customers = compute_from_tickets()
+    try:
+        TicketCounters.query.delete()
+        CustomerTicketCounts.query.delete()
+        db.session.add_all(TicketCounters(name=name, value=value) for name, value in counters.items())
+        db.session.add_all(
+            CustomerTicketCounts(customer_id=customer_id, total=total)
+            for customer_id, total in customers.items()
+        )
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return len(counters), len(customers)
+
+
+def verify():
+    """Return a list of (name, stored, expected) for every counter that has drifted"""
+    counters, customers = compute_from_tickets()
+    stored = read_counters()
+    stored_customers = {row.customer_id: row.total for row in CustomerTicketCounts.query.all()}
+
+    mismatches = []
+    for name in sorted(set(counters) | set(stored)):
+        if counters.get(name, 0) != stored.get(name, 0):
+            mismatches.append((name, stored.get(name, 0), counters.get(name, 0)))
+    for customer_id in sorted(set(customers) | set(stored_customers)):
+        if customers.get(customer_id, 0) != stored_customers.get(customer_id, 0):
+            mismatches.append((f'customer:{customer_id}', stored_customers.get(customer_id, 0),
+                               customers.get(customer_id, 0)))
+    return mismatches
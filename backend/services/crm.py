@@ -0,0 +1,197 @@
+"""
+HTTP client for the FastAPI/HubSpot CRM integration service.
+
+All CRM traffic goes through one pooled keep-alive requests.Session, and
+every call is timed so throughput can be read back from stats().
+AsyncCrmClient makes the same calls on asyncio (httpx), so the outbox
+dispatcher can keep CRM_OUTBOX_CONCURRENCY calls in flight from one thread.
+"""
+import asyncio
+import threading
+import time
+from collections import defaultdict
+import requests
+from requests.adapters import HTTPAdapter
+from backend import app, CRM_SERVICE_URL, CUSTOMER_SERVICE_URL
+from backend.services.instrumentation import observe_crm
+
+
+class CrmError(Exception):
+    """The CRM service answered with an unexpected status"""
+
+
+class CrmStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.monotonic()
+        self.calls = defaultdict(int)
+        self.items = defaultdict(int)
+        self.errors = defaultdict(int)
+        self.seconds = defaultdict(float)
+
+    def record(self, operation, items, elapsed, ok):
+        observe_crm(operation, elapsed)
+        with self._lock:
+            self.calls[operation] += 1
+            self.items[operation] += items
+            self.seconds[operation] += elapsed
+            if not ok:
+                self.errors[operation] += 1
+
+    def snapshot(self):
+        with self._lock:
+            uptime = time.monotonic() - self.started
+            operations = {
+                op: {
+                    'calls': self.calls[op],
+                    'items': self.items[op],
+                    'errors': self.errors[op],
+                    'avg_latency_ms': round(1000 * self.seconds[op] / self.calls[op], 2),
+                    'calls_per_second': round(self.calls[op] / uptime, 3) if uptime else 0.0,
+                    'items_per_second': round(self.items[op] / uptime, 3) if uptime else 0.0,
+                }
+                for op in self.calls
+            }
+            return {'uptime_seconds': round(uptime, 1), 'operations': operations}
+
+    def reset(self):
+        with self._lock:
+            self.started = time.monotonic()
+            for counter in (self.calls, self.items, self.errors, self.seconds):
+                counter.clear()
+
+
+class CrmClient:
+    def __init__(self, ticket_url, customer_url, pool_size=10, timeout=10):
+        self.ticket_url = ticket_url
+        self.customer_url = customer_url
+        self.timeout = timeout
+        self.stats = CrmStats()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def _call(self, operation, method, url, payload, items=1, expected=(200, 201)):
+        start = time.perf_counter()
+        ok = False
+        try:
+            response = self.session.request(method, url, json=payload, timeout=self.timeout)
+            ok = response.status_code in expected
+            if not ok:
+                raise CrmError(f"HubSpot sync failed: {response.status_code} {response.text}")
+            return response.json()
+        finally:
+            self.stats.record(operation, items, time.perf_counter() - start, ok)
+
+    def create_ticket(self, payload):
+        return self._call('ticket.create', 'POST', self.ticket_url, payload, expected=(201,))
+
+    def update_ticket(self, hubspot_ticket_id, payload):
+        return self._call('ticket.update', 'PATCH', f"{self.ticket_url}/{hubspot_ticket_id}", payload)
+
+    def create_contact(self, payload):
+        return self._call('customer.create', 'POST', self.customer_url, payload, expected=(201,))
+
+    def create_tickets_batch(self, payloads):
+        """POST {ticket_url}/batch; returns one result dict per payload, in order"""
+        data = self._call('ticket.create.batch', 'POST', f"{self.ticket_url}/batch",
+                          {'inputs': payloads}, items=len(payloads))
+        return data['results']
+
+    def create_contacts_batch(self, payloads):
+        """POST {customer_url}/batch; returns one result dict per payload, in order"""
+        data = self._call('customer.create.batch', 'POST', f"{self.customer_url}/batch",
+                          {'inputs': payloads}, items=len(payloads))
+        return data['results']
+
+
+client = CrmClient(
+    CRM_SERVICE_URL,
+    CUSTOMER_SERVICE_URL,
+    pool_size=app.config['CRM_POOL_SIZE'],
+    timeout=app.config['CRM_TIMEOUT'],
+)
+
+
+class AsyncCrmClient:
+    """
+    asyncio version of CrmClient's single-item calls. Needs httpx. It owns an
+    event loop, so use one instance per thread (see async_client()).
+    """
+
+    def __init__(self, ticket_url, customer_url, concurrency=100, timeout=10, stats=None):
+        import httpx
+        self._httpx = httpx
+        self.ticket_url = ticket_url
+        self.customer_url = customer_url
+        self.concurrency = concurrency
+        self.stats = stats or CrmStats()
+        self.loop = asyncio.new_event_loop()
+        self.client = httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+        )
+
+    async def _call(self, operation, method, url, payload, expected=(200, 201)):
+        start = time.perf_counter()
+        ok = False
+        try:
+            response = await self.client.request(method, url, json=payload)
+            ok = response.status_code in expected
+            if not ok:
+                raise CrmError(f"HubSpot sync failed: {response.status_code} {response.text}")
+            return response.json()
+        except self._httpx.HTTPError as e:
+            raise CrmError(f"CRM request failed: {e}") from e
+        finally:
+            self.stats.record(operation, 1, time.perf_counter() - start, ok)
+
+    async def create_ticket(self, payload):
+        return await self._call('ticket.create', 'POST', self.ticket_url, payload, expected=(201,))
+
+    async def update_ticket(self, hubspot_ticket_id, payload):
+        return await self._call('ticket.update', 'PATCH', f"{self.ticket_url}/{hubspot_ticket_id}", payload)
+
+    async def create_contact(self, payload):
+        return await self._call('customer.create', 'POST', self.customer_url, payload, expected=(201,))
+
+    def run_all(self, calls):
+        """
+        Run [(method name, args)] concurrently, at most `concurrency` at a time.
+        Returns one result per call, in order; failed calls return their exception.
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def run(method, args):
+            async with semaphore:
+                return await getattr(self, method)(*args)
+
+        async def gather():
+            return await asyncio.gather(*(run(method, args) for method, args in calls), return_exceptions=True)
+
+        return self.loop.run_until_complete(gather())
+
+    def close(self):
+        self.loop.run_until_complete(self.client.aclose())
+        self.loop.close()
+
+
+_async_clients = threading.local()
+
+
+def async_client(concurrency):
+    """This thread's AsyncCrmClient; call stats are shared with `client`"""
+    current = getattr(_async_clients, 'client', None)
+    if current is None or current.concurrency != concurrency:
+        if current is not None:
+            current.close()
+        current = _async_clients.client = AsyncCrmClient(
+            CRM_SERVICE_URL,
+            CUSTOMER_SERVICE_URL,
+            concurrency=concurrency,
+            timeout=app.config['CRM_TIMEOUT'],
+            stats=client.stats,
+        )
+    return current
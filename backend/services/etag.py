@@ -0,0 +1,89 @@
+"""
+Strong ETags and conditional GET for list/dashboard endpoints.
+
+Each write bumps the data_versions row of the table it touches (bump(),
+inside the write's transaction). A response's ETag is derived from the
+request path, its normalized query string and the versions of the tables
+the endpoint reads, so checking If-None-Match costs one primary-key lookup
+and a match returns 304 without running the view at all. The response
+cache (backend/services/cache.py) keys its entries on the same versions.
+"""
+import hashlib
+from functools import wraps
+from flask import g, request, current_app, Response
+from backend import db
+from backend.models import DataVersions
+from backend.services import counters
+
+# Comma separated filters whose order doesn't matter
+LIST_PARAMS = ('status', 'priority')
+
+
+def bump(*names):
+    """Increment table versions; call before committing the write"""
+    for name in sorted(names):
+        counters.increment(DataVersions, {'name': name}, 'version', 1)
+
+
+def next_change(name):
+    """
+    Bump name's version and return the new value. The data_versions row stays
+    locked until the write commits, so these numbers increase in commit order:
+    once a reader sees one, every write with a smaller one has committed.
+    """
+    bump(name)
+    return db.session.query(DataVersions.version).filter(DataVersions.name == name).scalar()
+
+
+def versions(names):
+    """{name: version}; read once per request, so the ETag and the cache key always agree"""
+    seen = g.setdefault('data_versions', {})
+    missing = [name for name in names if name not in seen]
+    if missing:
+        stored = dict(
+            db.session.query(DataVersions.name, DataVersions.version).filter(DataVersions.name.in_(missing))
+        )
+        seen.update({name: stored.get(name, 0) for name in missing})
+    return {name: seen[name] for name in names}
+
+
+def read_versions(names):
+    current = versions(names)
+    return [f'{name}:{current[name]}' for name in names]
+
+
+def normalized_args():
+    parts = []
+    for key in sorted(request.args):
+        values = request.args.getlist(key)
+        if key in LIST_PARAMS:
+            values = [','.join(sorted({v for value in values for v in value.split(',') if v}))]
+        parts.extend(f'{key}={value}' for value in sorted(values))
+    return '&'.join(parts)
+
+
+def compute_etag(names):
+    raw = f"{request.path}?{normalized_args()}|{','.join(read_versions(names))}"
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def conditional(*names):
+    """Emit an ETag for successful responses and answer matching If-None-Match with 304"""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            etag = compute_etag(names)
+
+            if etag in request.if_none_match:
+                response = Response(status=304)
+                response.set_etag(etag)
+                response.headers['Cache-Control'] = 'no-cache'
+                return response
+
+            response = current_app.make_response(view(*args, **kwargs))
+            if response.status_code == 200 and not response.is_streamed:
+                response.set_etag(etag)
+                response.headers['Cache-Control'] = 'no-cache'
+            return response
+        return wrapper
+    return decorator
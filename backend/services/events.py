@@ -0,0 +1,57 @@
+"""
+Domain events delivered after commit.
+
+Write routes call emit() while their transaction is open; the events are
+held on the session and handed to subscribers once the commit succeeds (a
+rollback discards them). This replaces Flask-SQLAlchemy's modification
+tracking, which recorded every flushed object just to send signals nothing
+listened to.
+
+Subscribers are side effects that may only happen once the data is
+durable: the live stream bus (backend/services/pubsub.py) and the
+identity cache (backend/services/identity.py). Ticket counters, the CRM
+outbox and ETag versions (which the response cache is keyed on) are NOT
+subscribers: they are rows written in the same transaction as the
+change, so a crash between commit and dispatch can't leave them out of
+step with the tickets table.
+"""
+from collections import defaultdict
+from sqlalchemy import event
+from backend import db
+
+TICKET_EVENTS = ('ticket.created', 'ticket.updated', 'ticket.deleted', 'tickets.imported')
+CUSTOMER_EVENTS = ('customer.created', 'customer.updated', 'customer.deleted', 'customers.imported')
+USER_EVENTS = ('user.updated', 'user.deleted')
+
+_subscribers = defaultdict(list)
+
+
+def subscribe(names, handler):
+    """Call handler(name, data) after every committed event in names"""
+    for name in names:
+        _subscribers[name].append(handler)
+
+
+def emit(name, data):
+    """Queue an event on the current transaction; subscribers see it after commit"""
+    db.session().info.setdefault('pending_events', []).append((name, data))
+
+
+def dispatch(name, data):
+    for handler in _subscribers[name]:
+        try:
+            handler(name, data)
+        except Exception as e:
+            # The write is already committed, a failing subscriber must not turn it into a 500
+            print(f"Warning: {name} subscriber {handler.__qualname__} failed: {e}")
+
+
+@event.listens_for(db.session, 'after_commit')
+def _after_commit(session):
+    for name, data in session.info.pop('pending_events', []):
+        dispatch(name, data)
+
+
+@event.listens_for(db.session, 'after_rollback')
+def _after_rollback(session):
+    session.info.pop('pending_events', None)
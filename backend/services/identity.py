@@ -0,0 +1,128 @@
+"""
+Cached JWT verification and user lookup.
+
+Every @jwt_required() request used to decode and verify its token (three
+JWT parses, about 0.3 ms) and, where it needed the user, load the row from
+the database. CachingJWTManager keeps the verified claims of each token
+for IDENTITY_CACHE_TTL seconds (never past the token's expiry), and the
+user lookup loader keeps the identity fields of each user for the same
+time, so an authenticated request costs neither. Views read the user with
+get_current_user(), a dict of USER_FIELDS.
+
+Invalidation:
+- logout revokes the token's jti until the token expires; the blocklist
+  is checked on every request, cached claims or not. With CACHE_REDIS_URL
+  set the blocklist is shared between workers, otherwise it is per process.
+  Entries are never evicted before the token expires, however many there
+  are, so a revoked token can't become valid again.
+- committed changes to a user (user.updated/user.deleted events) drop it
+  from the cache of the process that made them; other processes see the
+  change within IDENTITY_CACHE_TTL.
+"""
+import time
+from flask_jwt_extended import JWTManager
+from sqlalchemy import event
+from backend import app, db
+from backend.models import Users
+from backend.services import events
+from backend.services.cache import ExpiringCache, LRUCache, RedisCache
+from backend.services.metrics import CounterGroup
+
+USER_FIELDS = ('id', 'name', 'username', 'email')
+
+counters = CounterGroup('claims_hits', 'claims_misses', 'user_hits', 'user_misses', 'revoked')
+
+claims_cache = LRUCache(app.config['IDENTITY_CACHE_MAX_ENTRIES'])
+users_cache = LRUCache(app.config['IDENTITY_CACHE_MAX_ENTRIES'])
+
+
+def create_blocklist(config):
+    if config['CACHE_REDIS_URL']:
+        return RedisCache(config['CACHE_REDIS_URL'])
+    return ExpiringCache()
+
+
+blocklist = create_blocklist(app.config)
+
+
+class CachingJWTManager(JWTManager):
+    """
+    Flask-JWT-Extended has no public hook that can skip decoding, so this
+    overrides the private _decode_jwt_from_config: the version is pinned in
+    requirement.txt and tests/test_identity.py fails if it stops being called.
+    """
+
+    def _decode_jwt_from_config(self, encoded_token, csrf_value=None, allow_expired=False):
+        ttl = app.config['IDENTITY_CACHE_TTL']
+        # Only the plain case is cached: CSRF checks and expired-token decodes go through every time
+        if not ttl or csrf_value is not None or allow_expired:
+            return super()._decode_jwt_from_config(encoded_token, csrf_value, allow_expired)
+
+        claims = claims_cache.get(encoded_token)
+        if claims is not None:
+            counters.inc('claims_hits')
+            return dict(claims)
+
+        counters.inc('claims_misses')
+        claims = super()._decode_jwt_from_config(encoded_token, csrf_value, allow_expired)
+        if 'exp' in claims:
+            ttl = min(ttl, claims['exp'] - time.time())
+        if ttl > 0:
+            claims_cache.set(encoded_token, dict(claims), ttl)
+        return claims
+
+
+def load_user(user_id):
+    """USER_FIELDS of a user as a dict, or None if there is no such user"""
+    user = users_cache.get(user_id)
+    if user is not None:
+        counters.inc('user_hits')
+        return user
+
+    counters.inc('user_misses')
+    row = db.session.get(Users, int(user_id))
+    if row is None:
+        return None
+    user = {field: getattr(row, field) for field in USER_FIELDS}
+    if app.config['IDENTITY_CACHE_TTL']:
+        users_cache.set(user_id, user, app.config['IDENTITY_CACHE_TTL'])
+    return user
+
+
+def revoke(claims):
+    """Refuse this token from now until it expires"""
+    ttl = claims['exp'] - time.time() if 'exp' in claims else None
+    if ttl is None or ttl > 0:
+        blocklist.set(f'ssd:revoked:{claims["jti"]}', '1', ttl)
+        counters.inc('revoked')
+
+
+def is_revoked(claims):
+    return blocklist.get(f'ssd:revoked:{claims["jti"]}') is not None
+
+
+def invalidate_user(name, data):
+    users_cache.delete(str(data['id']))
+
+
+events.subscribe(events.USER_EVENTS, invalidate_user)
+
+
+# Users are written outside the write routes too (rehash on login, flask shell), so emit from the mapper
+@event.listens_for(Users, 'after_update')
+def _user_updated(mapper, connection, target):
+    events.emit('user.updated', {'id': target.id})
+
+
+@event.listens_for(Users, 'after_delete')
+def _user_deleted(mapper, connection, target):
+    events.emit('user.deleted', {'id': target.id})
+
+
+def init_app(jwt):
+    jwt.user_lookup_loader(lambda jwt_header, jwt_data: load_user(jwt_data[app.config['JWT_IDENTITY_CLAIM']]))
+    jwt.token_in_blocklist_loader(lambda jwt_header, jwt_data: is_revoked(jwt_data))
+
+
+def stats():
+    return {'claims_entries': len(claims_cache), 'user_entries': len(users_cache), **counters.snapshot()}
@@ -0,0 +1,168 @@
+"""
+Index audit and migration for the tickets table.
+
+audit() serves a representative set of read requests through the test
+client, collects the query shapes they ran (backend/services/query_shapes.py)
+and EXPLAINs every SELECT with the parameters it was first called with.
+The report shows which queries scan a whole table, which index each one
+uses, and which indexes no query used.
+
+migrate() brings an existing database in line with the model: it creates
+the composite indexes declared on Tickets and drops the single-column
+indexes they replace. New databases get the same set from `flask init-db`.
+add_columns() (run by `flask init-db`) adds columns newer versions of the
+model declare to tables an older version created.
+"""
+import re
+from flask_jwt_extended import create_access_token
+from sqlalchemy import inspect
+from backend import db
+from backend.models import Tickets, TicketTombstones, Users
+from backend.services import counters
+from backend.services.query_shapes import shapes
+
+# Indexes earlier versions of the model created and the current one doesn't need
+OBSOLETE_INDEXES = {
+    'tickets': ('ix_tickets_title', 'ix_tickets_description', 'ix_tickets_status',
+                'ix_tickets_priority', 'ix_tickets_category'),
+}
+MANAGED_TABLES = (Tickets.__table__,)
+# Columns added after their table was first created; each needs a server default for existing rows
+ADDED_COLUMNS = (
+    (Tickets.__table__, 'change_seq'),
+    (TicketTombstones.__table__, 'change_seq'),
+)
+AUDITED_TABLES = ('tickets', 'customers')
+
+AUDIT_REQUESTS = (
+    '/api/view_tickets?limit=50',
+    '/api/view_tickets?limit=50&after=100',
+    '/api/view_tickets?limit=50&status=Open',
+    '/api/view_tickets?limit=50&status=Open,In Progress&priority=High',
+    '/api/view_tickets?limit=50&priority=High,Medium',
+    '/api/view_tickets?limit=50&sort=updated_at',
+    '/api/tickets/changes?limit=100',
+    '/api/tickets/changes?limit=100&since=0',
+    '/api/tickets/search?q=printer',
+    '/api/dashboard/stats',
+    '/api/view_customers',
+)
+
+SQLITE_INDEX = re.compile(r'USING (?:COVERING )?INDEX (\w+)')
+
+
+def plan():
+    """(Index objects to create, (table, index name) pairs to drop)"""
+    inspector = inspect(db.engine)
+    create, drop = [], []
+    for table in MANAGED_TABLES:
+        existing = {ix['name'] for ix in inspector.get_indexes(table.name)}
+        create.extend(ix for ix in sorted(table.indexes, key=lambda ix: ix.name) if ix.name not in existing)
+        drop.extend((table.name, name) for name in OBSOLETE_INDEXES.get(table.name, ()) if name in existing)
+    return create, drop
+
+
+def drop_index(table, name):
+    if db.engine.dialect.name == 'mysql':
+        statement = f"DROP INDEX {name} ON {table}"
+    else:
+        statement = f"DROP INDEX {name}"
+    with db.engine.begin() as connection:
+        connection.exec_driver_sql(statement)
+
+
+def migrate(dry_run=False):
+    """Create missing model indexes, then drop obsolete ones. Returns (created, dropped) names."""
+    create, drop = plan()
+    if not dry_run:
+        # Create first so no query is left without an index in between
+        for index in create:
+            index.create(bind=db.engine)
+        for table, name in drop:
+            drop_index(table, name)
+    return [index.name for index in create], [name for _, name in drop]
+
+
+def add_columns():
+    """ALTER TABLE for every ADDED_COLUMNS entry the database lacks, with its indexes. Returns their names."""
+    inspector = inspect(db.engine)
+    added = []
+    for table, name in ADDED_COLUMNS:
+        if name in {column['name'] for column in inspector.get_columns(table.name)}:
+            continue
+        column = table.c[name]
+        column_type = column.type.compile(dialect=db.engine.dialect)
+        with db.engine.begin() as connection:
+            connection.exec_driver_sql(
+                f"ALTER TABLE {table.name} ADD COLUMN {name} {column_type} "
+                f"NOT NULL DEFAULT {column.server_default.arg}"
+            )
+        for index in sorted(table.indexes, key=lambda ix: ix.name):
+            if name in index.columns:
+                index.create(bind=db.engine)
+        added.append(f'{table.name}.{name}')
+    return added
+
+
+def run_workload(app):
+    """Serve AUDIT_REQUESTS with the response cache off, plus the counters recount"""
+    # Authenticated routes look their user up, so the token has to name a real one
+    user_id = db.session.query(Users.id).order_by(Users.id).limit(1).scalar()
+    if user_id is None:
+        print("Warning: no users in the database; authenticated audit requests will be refused")
+    headers = {'Authorization': f'Bearer {create_access_token(identity=str(user_id or 0))}'}
+    cache_enabled = app.config['CACHE_ENABLED']
+    app.config['CACHE_ENABLED'] = False
+    try:
+        client = app.test_client()
+        for path in AUDIT_REQUESTS:
+            client.get(path, headers=headers)
+    finally:
+        app.config['CACHE_ENABLED'] = cache_enabled
+    counters.compute_from_tickets()
+
+
+def explain(statement, parameters):
+    """(plan lines, full table scan?, index names used)"""
+    with db.engine.connect() as connection:
+        if db.engine.dialect.name == 'mysql':
+            rows = connection.exec_driver_sql(f"EXPLAIN {statement}", parameters).mappings().all()
+            lines = [f"{r['table']}: type={r['type']} key={r['key']} rows={r['rows']} {r['Extra'] or ''}".rstrip()
+                     for r in rows]
+            full_scan = any(r['type'] == 'ALL' for r in rows)
+            used = {r['key'] for r in rows if r['key']}
+        else:
+            rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+            lines = [row[-1] for row in rows]
+            # A scan in the ORDER BY's order that stops at LIMIT is fine; one feeding a sort is not
+            bounded = ' LIMIT ' in statement.upper() and not any('TEMP B-TREE' in line for line in lines)
+            full_scan = not bounded and any(line.startswith('SCAN ') and 'INDEX' not in line for line in lines)
+            used = {name for line in lines for name in SQLITE_INDEX.findall(line)}
+    return lines, full_scan, used
+
+
+def audit(app, workload=True):
+    if workload:
+        shapes.reset()
+        run_workload(app)
+
+    queries, used = [], set()
+    for shape, statement, parameters, calls in shapes.samples():
+        if not shape.upper().startswith('SELECT'):
+            continue
+        try:
+            lines, full_scan, indexes = explain(statement, parameters)
+        except Exception as e:
+            lines, full_scan, indexes = [f"EXPLAIN failed: {e}"], False, set()
+        used |= indexes
+        queries.append({'shape': shape, 'calls': calls, 'full_scan': full_scan,
+                        'indexes': sorted(indexes), 'plan': lines})
+
+    inspector = inspect(db.engine)
+    unused = {
+        table: sorted(ix['name'] for ix in inspector.get_indexes(table)
+                      if not ix.get('unique') and ix['name'] not in used)
+        for table in AUDITED_TABLES
+    }
+    queries.sort(key=lambda q: (not q['full_scan'], -q['calls']))
+    return {'dialect': db.engine.dialect.name, 'queries': queries, 'unused_indexes': unused}
@@ -0,0 +1,111 @@
+"""
+Per-request latency, SQL and CRM timing, and the slow request/query log.
+
+init_app() wraps every request: it records the request's latency, the
+number of SQL statements it ran and their total time (SQLAlchemy engine
+events) and the time spent in CRM calls (CrmStats.record). Everything is
+kept in per-endpoint histograms that /metrics renders for Prometheus. The
+same split is sent to the client as a Server-Timing header.
+
+Statements are also totalled per query shape (backend/services/query_shapes.py).
+
+Requests slower than SLOW_REQUEST_MS and statements slower than
+SLOW_QUERY_MS are logged as warnings on the 'backend.slow' logger.
+Streamed responses (SSE, NDJSON) are timed up to their first byte.
+"""
+import logging
+import time
+from flask import g, request, has_request_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from backend.services.metrics import HistogramFamily, COUNT_BUCKETS
+from backend.services.query_shapes import shapes
+
+SLOW_STATEMENT_CHARS = 500
+
+logger = logging.getLogger('backend.slow')
+
+request_seconds = HistogramFamily(('endpoint', 'method', 'status'))
+request_db_seconds = HistogramFamily(('endpoint',))
+request_db_statements = HistogramFamily(('endpoint',), buckets=COUNT_BUCKETS)
+crm_seconds = HistogramFamily(('operation',))
+
+_thresholds = {'request': 0.5, 'query': 0.1}
+
+
+def endpoint_name():
+    # Unmatched URLs (404s) share one series instead of one per path
+    return request.endpoint or 'unmatched'
+
+
+def start_request():
+    g.request_started = time.perf_counter()
+    g.db_statements = 0
+    g.db_seconds = 0.0
+    g.crm_seconds = 0.0
+
+
+def finish_request(response):
+    started = g.pop('request_started', None)
+    if started is None:
+        return response
+    elapsed = time.perf_counter() - started
+    endpoint = endpoint_name()
+
+    request_seconds.labels(endpoint, request.method, str(response.status_code)).observe(elapsed)
+    request_db_seconds.labels(endpoint).observe(g.db_seconds)
+    request_db_statements.labels(endpoint).observe(g.db_statements)
+
+    response.headers['Server-Timing'] = (
+        f'db;dur={g.db_seconds * 1000:.1f}, crm;dur={g.crm_seconds * 1000:.1f}, total;dur={elapsed * 1000:.1f}'
+    )
+    if elapsed >= _thresholds['request']:
+        logger.warning(
+            "Slow request %s %s -> %s in %.1f ms (%d SQL statements, %.1f ms DB, %.1f ms CRM)",
+            request.method, request.full_path.rstrip('?'), response.status_code, elapsed * 1000,
+            g.db_statements, g.db_seconds * 1000, g.crm_seconds * 1000,
+        )
+    return response
+
+
+def observe_crm(operation, elapsed):
+    """Called for every CRM call, in or out of a request"""
+    crm_seconds.labels(operation).observe(elapsed)
+    if has_request_context() and 'crm_seconds' in g:
+        g.crm_seconds += elapsed
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, 'handle_error')
+def _handle_error(context):
+    # after_cursor_execute doesn't run for a failed statement
+    started = context.connection.info.get('query_started') if context.connection is not None else None
+    if started:
+        started.pop()
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info['query_started'].pop()
+    shapes.record(statement, parameters, elapsed)
+    in_request = has_request_context() and 'db_statements' in g
+    if in_request:
+        g.db_statements += 1
+        g.db_seconds += elapsed
+    if elapsed >= _thresholds['query']:
+        logger.warning(
+            "Slow query in %s (%.1f ms): %s",
+            endpoint_name() if in_request else 'background', elapsed * 1000,
+            ' '.join(statement.split())[:SLOW_STATEMENT_CHARS],
+        )
+
+
+def init_app(app):
+    _thresholds['request'] = app.config['SLOW_REQUEST_MS'] / 1000
+    _thresholds['query'] = app.config['SLOW_QUERY_MS'] / 1000
+    app.before_request(start_request)
+    app.after_request(finish_request)
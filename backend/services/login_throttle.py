@@ -0,0 +1,96 @@
+"""
+Failed login throttle.
+
+Failed logins are counted per username and per client IP in fixed
+windows of LOGIN_THROTTLE_WINDOW seconds. Once a username reaches
+LOGIN_MAX_FAILURES, or an IP LOGIN_MAX_FAILURES_PER_IP, further attempts
+are refused until the window ends, before the user is looked up or any
+password is hashed. A successful login clears its username's count but
+not its IP's, so one valid account can't be used to reset an IP that is
+guessing others.
+
+Counts are kept in process, like the default response cache; with several
+gunicorn workers each one counts separately.
+"""
+import threading
+import time
+from collections import OrderedDict
+from backend import app
+from backend.services.metrics import CounterGroup
+
+counters = CounterGroup('failures', 'throttled')
+
+
+class FailureCache:
+    def __init__(self, window, max_entries=100000):
+        self.window = window
+        self.max_entries = max_entries
+        # key -> (failures, window end)
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def failures(self, key):
+        """(failures in the current window, seconds until it ends)"""
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return 0, 0
+            count, expires = item
+            if expires <= now:
+                del self._data[key]
+                return 0, 0
+            return count, expires - now
+
+    def add(self, key):
+        now = time.monotonic()
+        with self._lock:
+            count, expires = self._data.pop(key, (0, 0))
+            if expires <= now:
+                count, expires = 0, now + self.window
+            self._data[key] = (count + 1, expires)
+            # Oldest windows first; under a flood of distinct keys drop the oldest
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def __len__(self):
+        return len(self._data)
+
+
+failures = FailureCache(app.config['LOGIN_THROTTLE_WINDOW'])
+
+
+def keys(username, ip):
+    return f'user:{(username or "").strip().lower()}', f'ip:{ip}'
+
+
+def retry_after(username, ip):
+    """Seconds until this username/IP may try again, 0 if it may now"""
+    user_key, ip_key = keys(username, ip)
+    limits = ((user_key, app.config['LOGIN_MAX_FAILURES']), (ip_key, app.config['LOGIN_MAX_FAILURES_PER_IP']))
+    wait = 0
+    for key, limit in limits:
+        count, remaining = failures.failures(key)
+        if limit and count >= limit:
+            wait = max(wait, remaining)
+    if wait:
+        counters.inc('throttled')
+    return wait
+
+
+def record_failure(username, ip):
+    counters.inc('failures')
+    for key in keys(username, ip):
+        failures.add(key)
+
+
+def record_success(username, ip):
+    failures.clear(keys(username, ip)[0])
+
+
+def stats():
+    return {'tracked_keys': len(failures), **counters.snapshot()}
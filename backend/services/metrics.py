@@ -0,0 +1,102 @@
+"""
+Minimal thread-safe metric primitives shared by the instrumentation modules,
+and rendering to the Prometheus text exposition format (served at /metrics).
+"""
+import bisect
+import threading
+
+# Seconds; tuned for DB/HTTP timings from sub-millisecond to tens of seconds
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Plain counts, e.g. SQL statements per request
+COUNT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100, 200, 500)
+
+
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            self._count += 1
+
+    def snapshot(self):
+        """Cumulative bucket counts keyed by upper bound ('+Inf' last), plus sum and count"""
+        with self._lock:
+            cumulative = []
+            running = 0
+            for bound, count in zip(self.buckets + ('+Inf',), self._counts):
+                running += count
+                cumulative.append((bound, running))
+            return {'buckets': cumulative, 'sum': self._sum, 'count': self._count}
+
+
+class CounterGroup:
+    def __init__(self, *names):
+        self._values = dict.fromkeys(names, 0)
+        self._lock = threading.Lock()
+
+    def inc(self, name, amount=1):
+        with self._lock:
+            self._values[name] = self._values.get(name, 0) + amount
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._values)
+
+
+class HistogramFamily:
+    """One Histogram per combination of label values, e.g. per endpoint"""
+
+    def __init__(self, label_names, buckets=DEFAULT_BUCKETS):
+        self.label_names = tuple(label_names)
+        self.buckets = buckets
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values):
+        with self._lock:
+            histogram = self._histograms.get(values)
+            if histogram is None:
+                histogram = self._histograms[values] = Histogram(self.buckets)
+            return histogram
+
+    def series(self):
+        """[(labels dict, Histogram)] for prometheus_histogram()"""
+        with self._lock:
+            return [(dict(zip(self.label_names, values)), histogram)
+                    for values, histogram in sorted(self._histograms.items())]
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+               for value in labels.values())
+    return '{' + ','.join(f'{name}="{value}"' for name, value in zip(labels, escaped)) + '}'
+
+
+def prometheus_metric(name, kind, help_text, samples):
+    """Text lines for a counter or gauge; samples are [(labels dict, value)]"""
+    lines = [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}']
+    lines.extend(f'{name}{format_labels(labels)} {value}' for labels, value in samples)
+    return lines
+
+
+def prometheus_histogram(name, help_text, series):
+    """Text lines for a histogram; series are [(labels dict, Histogram)]"""
+    lines = [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+    for labels, histogram in series:
+        snapshot = histogram.snapshot()
+        for bound, count in snapshot['buckets']:
+            le = bound if bound == '+Inf' else format(bound, 'g')
+            lines.append(f'{name}_bucket{format_labels({**labels, "le": le})} {count}')
+        lines.append(f'{name}_sum{format_labels(labels)} {snapshot["sum"]}')
+        lines.append(f'{name}_count{format_labels(labels)} {snapshot["count"]}')
+    return lines
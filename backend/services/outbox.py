@@ -0,0 +1,328 @@
+"""
+Transactional outbox for CRM (HubSpot via the FastAPI service) sync.
+
+Write routes call enqueue() before committing, so the CRM work is stored
+atomically with the ticket/customer change and the request never waits on
+CRM_SERVICE_URL. OutboxDispatcher drains the table in the background,
+retrying failed calls with exponential backoff. With CRM_BATCH_ENABLED,
+pending creates are coalesced into bulk calls of up to CRM_BATCH_MAX_SIZE
+rows, waiting at most CRM_BATCH_MAX_WAIT seconds for a batch to fill.
+With CRM_OUTBOX_CONCURRENCY above 1 the remaining rows are sent together
+on asyncio (AsyncCrmClient) instead of one after another. Contacts go
+first: a ticket create waits while its customer's contact create is
+pending, since the CRM links tickets to contacts by email, and rows for
+the same ticket wait for the next drain so the CRM sees them in order.
+The CRM is called with no database transaction open (see drain_once).
+"""
+import json
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+import requests
+from sqlalchemy import and_
+from sqlalchemy.orm import aliased
+from backend import db
+from backend.models import CrmOutbox, Tickets
+from backend.services.crm import client, async_client, CrmError
+
+# Contacts first: the CRM links a ticket to its customer's contact by email
+BATCHABLE_EVENTS = ('customer.create', 'ticket.create')
+
+
+class RetryLater(Exception):
+    """The row cannot be sent yet (CRM down, or a dependency not synced)"""
+
+
+def enqueue(event, payload, ticket_id=None, customer_id=None):
+    """Add an outbox row to the current session; it is committed with the caller's transaction"""
+    db.session.add(CrmOutbox(
+        event=event,
+        payload=json.dumps(payload),
+        ticket_id=ticket_id,
+        customer_id=customer_id,
+    ))
+
+
+def backoff_delay(attempts, base, cap):
+    delay = min(cap, base * (2 ** (attempts - 1)))
+    return delay * random.uniform(0.5, 1.0)
+
+
+def store_ticket_result(row, result):
+    ticket = db.session.get(Tickets, row.ticket_id)
+    if ticket:
+        ticket.hubspot_ticket_id = result.get('hubspot_ticket_id')
+
+
+def payload_args(row, payload):
+    return (payload,)
+
+
+def ticket_update_args(row, payload):
+    """(hubspot id, payload) for the PATCH, or None when there is nothing to update"""
+    ticket = db.session.get(Tickets, row.ticket_id)
+    if not ticket:
+        return None
+
+    if not ticket.hubspot_ticket_id:
+        create_pending = CrmOutbox.query.filter_by(
+            ticket_id=row.ticket_id, event='ticket.create', status='pending'
+        ).first()
+        if create_pending:
+            raise RetryLater("Waiting for the ticket to be created in HubSpot")
+        # Never synced to HubSpot, nothing to update
+        return None
+
+    return ticket.hubspot_ticket_id, payload
+
+
+# event -> (CRM client method, its arguments for a row (None: skip), result handler)
+SENDERS = {
+    'ticket.create': ('create_ticket', payload_args, store_ticket_result),
+    'ticket.update': ('update_ticket', ticket_update_args, None),
+    'customer.create': ('create_contact', payload_args, None),
+}
+
+# event -> bulk CRM client method; results are stored with the SENDERS handler
+BATCH_SENDERS = {
+    'ticket.create': client.create_tickets_batch,
+    'customer.create': client.create_contacts_batch,
+}
+
+
+def mark_done(row):
+    row.status = 'done'
+    row.last_error = None
+
+
+def mark_retry(row, error, max_attempts, backoff_base, backoff_cap):
+    row.attempts += 1
+    row.last_error = str(error)
+    if row.attempts >= max_attempts:
+        row.status = 'failed'
+        print(f"Warning: CRM outbox row {row.id} ({row.event}) failed permanently: {error}")
+    else:
+        delay = backoff_delay(row.attempts, backoff_base, backoff_cap)
+        row.next_attempt_at = datetime.utcnow() + timedelta(seconds=delay)
+
+
+def order_keys(row):
+    """(keys of earlier rows this row must not overtake, keys it holds for later rows)"""
+    holds = set()
+    if row.ticket_id:
+        holds.add(('ticket', row.ticket_id))
+    if row.event == 'customer.create' and row.customer_id:
+        holds.add(('customer', row.customer_id))
+    waits_for = set(holds)
+    if row.event == 'ticket.create' and row.customer_id:
+        waits_for.add(('customer', row.customer_id))
+    return waits_for, holds
+
+
+def awaiting_contact():
+    """SQL condition matching ticket.create rows whose customer still has a customer.create pending"""
+    contact = aliased(CrmOutbox)
+    contact_pending = db.session.query(contact.id).filter(
+        contact.event == 'customer.create',
+        contact.status == 'pending',
+        contact.customer_id == CrmOutbox.customer_id,
+    ).exists()
+    return and_(CrmOutbox.event == 'ticket.create', contact_pending)
+
+
+def plan_calls(rows, retry):
+    """
+    ([(row id, client method, args)] for the rows that can be sent now, rows
+    processed). Rows that must not overtake an earlier one wait for the next
+    drain; rows with nothing to send, or not ready, are finished here.
+    """
+    claimed = set()
+    calls = []
+    processed = 0
+    for row in rows:
+        waits_for, holds = order_keys(row)
+        blocked = bool(waits_for & claimed)
+        # A held-back row still holds back later rows for the same ticket/customer
+        claimed |= holds
+        if blocked:
+            continue
+        processed += 1
+
+        method, call_args, _ = SENDERS[row.event]
+        try:
+            args = call_args(row, json.loads(row.payload))
+        except RetryLater as e:
+            retry(row, e)
+            continue
+        if args is None:
+            mark_done(row)
+            continue
+        calls.append((row.id, method, args))
+    return calls, processed
+
+
+def call_one_by_one(calls):
+    """{row id: (result, error)}"""
+    outcomes = {}
+    for row_id, method, args in calls:
+        try:
+            outcomes[row_id] = getattr(client, method)(*args), None
+        except (CrmError, requests.exceptions.RequestException) as e:
+            outcomes[row_id] = None, e
+    return outcomes
+
+
+def call_concurrent(calls, concurrency):
+    """{row id: (result, error)}, sending every call at once on asyncio"""
+    results = async_client(concurrency).run_all([(method, args) for _, method, args in calls])
+    return {
+        row_id: (None, result) if isinstance(result, Exception) else (result, None)
+        for (row_id, _, _), result in zip(calls, results)
+    }
+
+
+def call_batch(event, row_ids, payloads):
+    """{row id: (result, error)} for one bulk call"""
+    try:
+        results = BATCH_SENDERS[event](payloads)
+    except (CrmError, requests.exceptions.RequestException) as e:
+        return {row_id: (None, e) for row_id in row_ids}
+    return {
+        row_id: (None, result['error']) if result.get('error') else (result, None)
+        for row_id, result in zip(row_ids, results)
+    }
+
+
+def store_outcomes(outcomes, retry):
+    """Record the CRM results on their rows (and tickets) in the current transaction"""
+    rows = CrmOutbox.query.filter(CrmOutbox.id.in_(outcomes)).with_for_update().all()
+    for row in rows:
+        result, error = outcomes[row.id]
+        if error is not None:
+            retry(row, error)
+            continue
+        store_result = SENDERS[row.event][2]
+        if store_result:
+            store_result(row, result)
+        mark_done(row)
+
+
+def drain_once(batch_size=50, max_attempts=8, backoff_base=2.0, backoff_cap=300.0,
+               batching=False, batch_max_wait=0.0, concurrency=1, claim_seconds=600.0):
+    """
+    Send every due outbox row (up to batch_size). Returns the number of rows processed.
+
+    No transaction is open while the CRM is called, so a slow CRM never holds
+    locks the write routes wait on: the rows to send are claimed in one short
+    transaction (their next_attempt_at pushed claim_seconds ahead, so other
+    dispatchers skip them and a dispatcher that dies mid-drain leaves them to
+    be retried), then the results are stored in a second one.
+    """
+    now = datetime.utcnow()
+    # A ticket is not even picked up until its customer's contact is sent (or has failed for good)
+    rows = CrmOutbox.query \
+        .filter(CrmOutbox.status == 'pending', CrmOutbox.next_attempt_at <= now, ~awaiting_contact()) \
+        .order_by(CrmOutbox.id) \
+        .limit(batch_size) \
+        .with_for_update(skip_locked=True) \
+        .all()
+
+    def retry(row, error):
+        mark_retry(row, error, max_attempts, backoff_base, backoff_cap)
+
+    # 1. Claim the rows to send in a short transaction
+    batches, batched = [], []
+    if batching:
+        for event in BATCHABLE_EVENTS:
+            pending = [row for row in rows if row.event == event]
+            if not pending:
+                continue
+            # Hold a partial batch until it fills up or its oldest row has waited long enough
+            oldest_age = (now - min(row.created_at for row in pending)).total_seconds()
+            if len(pending) < batch_size and oldest_age < batch_max_wait:
+                continue
+            batches.append((event, [row.id for row in pending], [json.loads(row.payload) for row in pending]))
+            batched.extend(pending)
+        rows = [row for row in rows if row.event not in BATCHABLE_EVENTS]
+
+    calls, processed = plan_calls(rows, retry)
+    claimed_ids = {row_id for row_id, _, _ in calls}
+    for row in batched + [row for row in rows if row.id in claimed_ids]:
+        row.next_attempt_at = now + timedelta(seconds=claim_seconds)
+    db.session.commit()
+
+    # 2. Call the CRM with no transaction open
+    outcomes = {}
+    for event, row_ids, payloads in batches:
+        outcomes.update(call_batch(event, row_ids, payloads))
+    if calls:
+        outcomes.update(call_concurrent(calls, concurrency) if concurrency > 1 else call_one_by_one(calls))
+
+    # 3. Store the results in a second short transaction
+    if outcomes:
+        store_outcomes(outcomes, retry)
+        db.session.commit()
+    return processed + len(batched)
+
+
+def drain_kwargs(config):
+    batching = config['CRM_BATCH_ENABLED']
+    concurrency = config['CRM_OUTBOX_CONCURRENCY']
+    batch_size = config['CRM_BATCH_MAX_SIZE'] if batching else config['CRM_OUTBOX_BATCH_SIZE']
+    return {
+        # Fetch enough rows to fill every concurrent slot
+        'batch_size': max(batch_size, concurrency),
+        'max_attempts': config['CRM_OUTBOX_MAX_ATTEMPTS'],
+        'batching': batching,
+        'batch_max_wait': config['CRM_BATCH_MAX_WAIT'],
+        'concurrency': concurrency,
+        'claim_seconds': config['CRM_OUTBOX_CLAIM_SECONDS'],
+    }
+
+
+class OutboxDispatcher(threading.Thread):
+    """Background thread draining the outbox until stop() is called"""
+
+    def __init__(self, app):
+        super().__init__(name='crm-outbox-dispatcher', daemon=True)
+        self.app = app
+        self.interval = app.config['CRM_OUTBOX_POLL_INTERVAL']
+        if app.config['CRM_BATCH_ENABLED']:
+            self.interval = min(self.interval, app.config['CRM_BATCH_MAX_WAIT'])
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            processed = 0
+            with self.app.app_context():
+                try:
+                    processed = drain_once(**drain_kwargs(self.app.config))
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"Warning: CRM outbox dispatcher error: {e}")
+                finally:
+                    db.session.remove()
+            # Keep draining while there is a backlog, otherwise poll
+            if not processed:
+                self._stop_event.wait(self.interval)
+
+    def stop(self, timeout=None):
+        self._stop_event.set()
+        self.join(timeout)
+
+
+def start_dispatcher(app):
+    dispatcher = OutboxDispatcher(app)
+    dispatcher.start()
+    return dispatcher
+
+
+def run_forever(app):
+    """Drain in the current process (used by `flask outbox run`)"""
+    dispatcher = start_dispatcher(app)
+    try:
+        while dispatcher.is_alive():
+            time.sleep(1)
+    except KeyboardInterrupt:
+        dispatcher.stop()
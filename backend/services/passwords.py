@@ -0,0 +1,83 @@
+"""
+Password hashing and verification.
+
+Hashes use PASSWORD_HASH_METHOD (any werkzeug method string, e.g.
+'scrypt:16384:8:1' or 'pbkdf2:sha256:600000'). Stored hashes made with
+another method keep working: needs_rehash() tells the login route to
+re-hash the password with the current method once it has been verified,
+so changing the setting migrates users as they log in.
+
+Hashing is CPU bound (werkzeug's scrypt and pbkdf2 run in OpenSSL with
+the GIL released), so a burst of logins competes with every other request
+for the cores. At most PASSWORD_HASH_WORKERS hashes run at once per
+server process (0: no limit); others wait up to PASSWORD_HASH_QUEUE_TIMEOUT seconds for
+a slot and then get HasherBusy instead of piling up.
+"""
+import threading
+import time
+from werkzeug.security import generate_password_hash, check_password_hash
+from backend import app
+from backend.services.metrics import Histogram, CounterGroup
+
+hash_seconds = Histogram()
+counters = CounterGroup('hashes', 'verifications', 'failures', 'rehashes', 'busy')
+
+
+class HasherBusy(Exception):
+    """Too many hashes queued; the client should retry later"""
+
+
+class Hasher:
+    def __init__(self, method, workers, queue_timeout):
+        self.method = method
+        # werkzeug writes defaults into the stored prefix ('scrypt' -> 'scrypt:32768:8:1')
+        self.prefix = generate_password_hash('', method).split('$', 1)[0]
+        self.workers = workers
+        self.queue_timeout = queue_timeout
+        self._slots = threading.BoundedSemaphore(workers) if workers > 0 else None
+
+    def run(self, fn, *args):
+        if self._slots is None:
+            return fn(*args)
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            counters.inc('busy')
+            raise HasherBusy()
+        try:
+            return fn(*args)
+        finally:
+            self._slots.release()
+
+    def hash(self, password):
+        started = time.perf_counter()
+        pwhash = self.run(generate_password_hash, password, self.method)
+        hash_seconds.observe(time.perf_counter() - started)
+        counters.inc('hashes')
+        return pwhash
+
+    def verify(self, pwhash, password):
+        if not pwhash or password is None:
+            return False
+        started = time.perf_counter()
+        valid = self.run(check_password_hash, pwhash, password)
+        hash_seconds.observe(time.perf_counter() - started)
+        counters.inc('verifications' if valid else 'failures')
+        return valid
+
+    def needs_rehash(self, pwhash):
+        return pwhash.split('$', 1)[0] != self.prefix
+
+
+hasher = Hasher(
+    app.config['PASSWORD_HASH_METHOD'],
+    app.config['PASSWORD_HASH_WORKERS'],
+    app.config['PASSWORD_HASH_QUEUE_TIMEOUT'],
+)
+
+
+def stats():
+    return {
+        'method': hasher.prefix,
+        'workers': hasher.workers,
+        **counters.snapshot(),
+        'seconds': hash_seconds.snapshot(),
+    }
@@ -0,0 +1,69 @@
+"""
+Instrumented SQLAlchemy connection pool.
+
+InstrumentedQueuePool times how long each checkout waits for a free
+connection, and the pool event listeners below record how long
+connections are held and how often they are opened, invalidated or time
+out. Read it all with pool_status(engine).
+"""
+import time
+from sqlalchemy import event, exc
+from sqlalchemy.pool import Pool, QueuePool
+from backend.services.metrics import Histogram, CounterGroup
+
+checkout_wait = Histogram()
+hold_time = Histogram()
+counters = CounterGroup('connects', 'checkouts', 'invalidations', 'timeouts')
+
+
+class InstrumentedQueuePool(QueuePool):
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            counters.inc('timeouts')
+            raise
+        finally:
+            checkout_wait.observe(time.perf_counter() - start)
+
+
+@event.listens_for(Pool, 'connect')
+def _on_connect(dbapi_connection, connection_record):
+    counters.inc('connects')
+
+
+@event.listens_for(Pool, 'checkout')
+def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+    counters.inc('checkouts')
+    connection_record.info['checked_out_at'] = time.perf_counter()
+
+
+@event.listens_for(Pool, 'checkin')
+def _on_checkin(dbapi_connection, connection_record):
+    started = connection_record.info.pop('checked_out_at', None)
+    if started is not None:
+        hold_time.observe(time.perf_counter() - started)
+
+
+@event.listens_for(Pool, 'invalidate')
+def _on_invalidate(dbapi_connection, connection_record, exception):
+    counters.inc('invalidations')
+
+
+def pool_status(engine):
+    pool = engine.pool
+    status = {'pool_class': type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update({
+            'size': pool.size(),
+            'checked_in': pool.checkedin(),
+            'checked_out': pool.checkedout(),
+            'overflow': pool.overflow(),
+            'max_overflow': pool._max_overflow,
+            'timeout_seconds': pool.timeout(),
+        })
+    status.update(counters.snapshot())
+    status['checkout_wait_seconds'] = checkout_wait.snapshot()
+    status['hold_seconds'] = hold_time.snapshot()
+    return status
@@ -0,0 +1,129 @@
+"""
+In-process pub/sub bus for live ticket updates.
+
+Committed ticket events (backend/services/events.py) are published here;
+/api/stream/tickets (SSE) and
+/api/stream/poll (long-poll) deliver the events. Every event gets an
+increasing id and the last EVENT_HISTORY events are kept, so reconnecting
+clients resume from Last-Event-ID / ?after= without missing anything.
+
+The bus lives in one process: with several workers, a subscriber only sees
+writes handled by its own worker, and ids differ between workers, so run
+the stream on a single process (or put a shared broker behind publish()).
+/api/stream/poll also returns the tickets data version, which is shared.
+"""
+import itertools
+import json
+import queue
+import threading
+import time
+from collections import deque
+from backend.services import events
+
+EVENT_HISTORY = 1000
+SUBSCRIBER_QUEUE_SIZE = 256
+
+
+class Subscription:
+    def __init__(self, bus):
+        self.bus = bus
+        self.queue = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.overflowed = False
+
+    def get(self, timeout):
+        """Next event dict, or None when timeout expires"""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.bus.unsubscribe(self)
+
+
+class Bus:
+    def __init__(self):
+        self._ids = itertools.count(1)
+        self._history = deque(maxlen=EVENT_HISTORY)
+        self._subscribers = set()
+        self._condition = threading.Condition()
+        self.published = 0
+        self.dropped = 0
+        self.rejected = 0
+
+    def publish(self, name, data):
+        with self._condition:
+            event = {'id': next(self._ids), 'event': name, 'data': data, 'time': time.time()}
+            self._history.append(event)
+            self.published += 1
+            for subscription in self._subscribers:
+                try:
+                    subscription.queue.put_nowait(event)
+                except queue.Full:
+                    # A stalled client must not block writers; it gets a resync hint instead
+                    subscription.overflowed = True
+                    self.dropped += 1
+            self._condition.notify_all()
+        return event
+
+    def subscribe(self, limit=0):
+        """New Subscription, or None when `limit` (0: no limit) subscribers are already connected"""
+        subscription = Subscription(self)
+        with self._condition:
+            if limit and len(self._subscribers) >= limit:
+                self.rejected += 1
+                return None
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._condition:
+            self._subscribers.discard(subscription)
+
+    def since(self, after):
+        """
+        Events with id > after still in history. None means the client must
+        resync: events it missed were evicted, or its id is from before a restart.
+        """
+        with self._condition:
+            last = self._history[-1]['id'] if self._history else 0
+            if after > last or (self._history and after < self._history[0]['id'] - 1):
+                return None
+            return [event for event in self._history if event['id'] > after]
+
+    def wait(self, after, timeout):
+        """Block until an event newer than `after` exists (or timeout), then return like since()"""
+        events = self.since(after)
+        if events is None or events:
+            return events
+
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while not (self._history and self._history[-1]['id'] > after):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+        return self.since(after)
+
+    def last_id(self):
+        with self._condition:
+            return self._history[-1]['id'] if self._history else 0
+
+    def stats(self):
+        with self._condition:
+            return {
+                'subscribers': len(self._subscribers),
+                'published': self.published,
+                'dropped': self.dropped,
+                'rejected': self.rejected,
+                'last_event_id': self._history[-1]['id'] if self._history else 0,
+            }
+
+
+def format_sse(event):
+    return f"id: {event['id']}\nevent: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
+
+
+bus = Bus()
+events.subscribe(events.TICKET_EVENTS, bus.publish)
@@ -0,0 +1,79 @@
+"""
+Query shape capture.
+
+Every executed statement is reduced to its shape: placeholders unified and
+IN lists collapsed, so `status IN (?, ?)` and `status IN (?, ?, ?)` count
+as one query. Calls and time are totalled per shape (GET
+/api/metrics/queries), and the parameters of the first call are kept in
+memory so `flask indexes audit` can EXPLAIN the shape. They are never
+served over HTTP.
+"""
+import re
+import threading
+
+MAX_SHAPES = 500
+PLACEHOLDER = re.compile(r'%\(\w+\)s|%s|\?')
+IN_LIST = re.compile(r'\bIN \(\?(?:\s*,\s*\?)*\)', re.IGNORECASE)
+VALUES_LIST = re.compile(r'\bVALUES \(\?(?:\s*,\s*\?)*\)(?:\s*,\s*\(\?(?:\s*,\s*\?)*\))*', re.IGNORECASE)
+
+
+class QueryShapes:
+    def __init__(self, max_shapes=MAX_SHAPES):
+        self.max_shapes = max_shapes
+        self._shapes = {}
+        self._normalized = {}
+        self._lock = threading.Lock()
+
+    def normalize(self, statement):
+        # Statements come from a small set of compiled queries, so remember their shapes
+        shape = self._normalized.get(statement)
+        if shape is None:
+            shape = ' '.join(statement.split())
+            shape = PLACEHOLDER.sub('?', shape)
+            shape = IN_LIST.sub('IN (?...)', shape)
+            shape = VALUES_LIST.sub('VALUES (?...)', shape)
+            if len(self._normalized) < self.max_shapes * 4:
+                self._normalized[statement] = shape
+        return shape
+
+    def record(self, statement, parameters, elapsed):
+        shape = self.normalize(statement)
+        with self._lock:
+            entry = self._shapes.get(shape)
+            if entry is None:
+                if len(self._shapes) >= self.max_shapes:
+                    return
+                entry = self._shapes[shape] = {
+                    'calls': 0, 'seconds': 0.0, 'max_seconds': 0.0,
+                    'statement': statement, 'parameters': parameters,
+                }
+            entry['calls'] += 1
+            entry['seconds'] += elapsed
+            entry['max_seconds'] = max(entry['max_seconds'], elapsed)
+
+    def samples(self):
+        """[(shape, statement, parameters, calls)] for EXPLAIN"""
+        with self._lock:
+            return [(shape, e['statement'], e['parameters'], e['calls']) for shape, e in self._shapes.items()]
+
+    def snapshot(self, top=50):
+        """Shapes with the most total time first, without their parameters"""
+        with self._lock:
+            ranked = sorted(self._shapes.items(), key=lambda item: item[1]['seconds'], reverse=True)[:top]
+            return [
+                {
+                    'shape': shape,
+                    'calls': e['calls'],
+                    'total_ms': round(e['seconds'] * 1000, 2),
+                    'avg_ms': round(e['seconds'] * 1000 / e['calls'], 3),
+                    'max_ms': round(e['max_seconds'] * 1000, 2),
+                }
+                for shape, e in ranked
+            ]
+
+    def reset(self):
+        with self._lock:
+            self._shapes.clear()
+
+
+shapes = QueryShapes()
@@ -0,0 +1,148 @@
+"""
+Full-text search over ticket title and description.
+
+MySQL uses a FULLTEXT index with MATCH ... AGAINST ranking. SQLite uses an
+external-content FTS5 table kept in sync by triggers, ranked with bm25().
+Any other database (or SQLite built without FTS5) falls back to LIKE
+matching with ranking done in Python, which is only meant for tests and
+small dev databases.
+
+Run `flask search init` (main.py does it on startup) to create the index.
+Because MySQL maintains FULLTEXT itself and SQLite uses triggers, every
+write path, including bulk imports, stays in sync without extra calls.
+"""
+import re
+from sqlalchemy import text, or_, and_, inspect
+from backend import db
+from backend.models import Tickets
+
+FALLBACK_CANDIDATES = 5000
+TERM_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+SQLITE_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS tickets_fts USING fts5(
+        title, description, content='tickets', content_rowid='id'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tickets_fts_ai AFTER INSERT ON tickets BEGIN
+        INSERT INTO tickets_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tickets_fts_ad AFTER DELETE ON tickets BEGIN
+        INSERT INTO tickets_fts(tickets_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tickets_fts_au AFTER UPDATE OF title, description ON tickets BEGIN
+        INSERT INTO tickets_fts(tickets_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO tickets_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END
+    """,
+]
+
+MYSQL_INDEX = 'ix_tickets_fulltext'
+
+_backend = None
+
+
+def terms(query):
+    return [t.lower() for t in TERM_PATTERN.findall(query)]
+
+
+def install():
+    """Create the full-text index for the current database and backfill it"""
+    global _backend
+    dialect = db.engine.dialect.name
+
+    if dialect == 'mysql':
+        indexes = {ix['name'] for ix in inspect(db.engine).get_indexes('tickets')}
+        if MYSQL_INDEX not in indexes:
+            db.session.execute(text(f"CREATE FULLTEXT INDEX {MYSQL_INDEX} ON tickets (title, description)"))
+            db.session.commit()
+        _backend = 'mysql'
+    elif dialect == 'sqlite':
+        try:
+            for statement in SQLITE_DDL:
+                db.session.execute(text(statement))
+            db.session.execute(text("INSERT INTO tickets_fts(tickets_fts) VALUES ('rebuild')"))
+            db.session.commit()
+            _backend = 'fts5'
+        except Exception as e:
+            db.session.rollback()
+            print(f"Warning: SQLite FTS5 unavailable, ticket search falls back to LIKE: {e}")
+            _backend = 'fallback'
+    else:
+        _backend = 'fallback'
+    return _backend
+
+
+def active_backend():
+    global _backend
+    if _backend is None:
+        dialect = db.engine.dialect.name
+        if dialect == 'mysql':
+            indexes = {ix['name'] for ix in inspect(db.engine).get_indexes('tickets')}
+            _backend = 'mysql' if MYSQL_INDEX in indexes else 'fallback'
+        elif dialect == 'sqlite' and inspect(db.engine).has_table('tickets_fts'):
+            _backend = 'fts5'
+        else:
+            _backend = 'fallback'
+    return _backend
+
+
+def search_ids(query, limit, offset):
+    """Return [(ticket_id, score)] best match first, at most limit rows starting at offset"""
+    words = terms(query)
+    if not words:
+        return []
+
+    backend = active_backend()
+    params = {'limit': limit, 'offset': offset}
+
+    if backend == 'mysql':
+        params['q'] = ' '.join(words)
+        rows = db.session.execute(text(
+            "SELECT id, MATCH(title, description) AGAINST (:q IN NATURAL LANGUAGE MODE) AS score "
+            "FROM tickets WHERE MATCH(title, description) AGAINST (:q IN NATURAL LANGUAGE MODE) "
+            "ORDER BY score DESC, id LIMIT :limit OFFSET :offset"
+        ), params)
+        return [(row.id, float(row.score)) for row in rows]
+
+    if backend == 'fts5':
+        # Quote every term so user input can't inject FTS5 syntax; prefix match each one
+        params['q'] = ' '.join(f'"{w}"*' for w in words)
+        rows = db.session.execute(text(
+            "SELECT rowid AS id, bm25(tickets_fts) AS rank FROM tickets_fts "
+            "WHERE tickets_fts MATCH :q ORDER BY rank, rowid LIMIT :limit OFFSET :offset"
+        ), params)
+        # bm25() is lower-is-better, flip it so higher scores rank first everywhere
+        return [(row.id, -float(row.rank)) for row in rows]
+
+    return _fallback_search(words, limit, offset)
+
+
+def _fallback_search(words, limit, offset):
+    conditions = [
+        or_(Tickets.title.ilike(f'%{w}%'), Tickets.description.ilike(f'%{w}%'))
+        for w in words
+    ]
+    candidates = db.session.query(Tickets.id, Tickets.title, Tickets.description) \
+        .filter(and_(*conditions)) \
+        .limit(FALLBACK_CANDIDATES) \
+        .all()
+
+    scored = []
+    for ticket_id, title, description in candidates:
+        title_terms = terms(title or '')
+        description_terms = terms(description or '')
+        # Title hits count double
+        score = sum(2 * title_terms.count(w) + description_terms.count(w) for w in words)
+        scored.append((ticket_id, float(score)))
+
+    scored.sort(key=lambda item: (-item[1], item[0]))
+    return scored[offset:offset + limit]
@@ -0,0 +1,203 @@
+"""
+API benchmark: seed a database, serve the backend, drive every endpoint.
+
+    python -m bench.api --customers 10000 --tickets 100000 --output bench_output.json
+
+Seeds a throwaway SQLite database with bench.seed (or uses --database-url,
+e.g. a MySQL schema; add --no-seed to reuse one seeded earlier), starts
+the backend with gunicorn (or --server dev for python main.py) pointed at
+an in-process stub CRM, then runs each scenario below for --duration
+seconds with --concurrency client threads. The JSON report has p50/p95/p99
+latency, throughput and errors per scenario, the peak RSS of the server
+processes and the git commit, so runs can be compared across commits.
+
+The response cache is off unless --cache is given, so read scenarios
+measure the queries rather than cache hits. Customer by-name routes are
+left out: they filter on a column Customers doesn't have.
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+import requests
+from bench.common import BASE_URL, ROOT, SERVERS, BENCH_USER, start_server, stop_server, login, drive
+from bench.seed import WORDS, letters
+from tools.stub_crm import start_stub_crm
+
+
+def scenarios(token, customer_ids, max_ticket_id, run_id):
+    """name -> make_request(session, n)"""
+    auth = {'Authorization': f'Bearer {token}'}
+    # Delta sync over roughly the last 100 ticket writes
+    version = requests.get(f'{BASE_URL}/api/stream/poll', params={'timeout': 0}, headers=auth, timeout=60).json()['version']
+    since = str(max(0, version - 100))
+
+    def get(path, **params):
+        return lambda session, n: session.get(f'{BASE_URL}{path}', params=params, headers=auth, timeout=60)
+
+    def ticket_id(n):
+        return random.Random(n).randint(1, max_ticket_id)
+
+    return {
+        'auth.login': lambda session, n: session.post(
+            f'{BASE_URL}/api/login', json=BENCH_USER, timeout=60),
+        'auth.check_auth': get('/api/check_auth'),
+        'ticket.list_page': get('/api/view_tickets', limit=50),
+        'ticket.list_filtered': get('/api/view_tickets', limit=50, status='Open,In Progress', priority='High'),
+        'ticket.list_cursor': lambda session, n: session.get(
+            f'{BASE_URL}/api/view_tickets', params={'limit': 50, 'sort': 'id', 'after': ticket_id(n)},
+            headers=auth, timeout=60),
+        'ticket.search': lambda session, n: session.get(
+            f'{BASE_URL}/api/tickets/search', params={'q': WORDS[n % len(WORDS)], 'limit': 20},
+            headers=auth, timeout=60),
+        'ticket.changes': get('/api/tickets/changes', since=since, limit=500),
+        'ticket.create': lambda session, n: session.post(
+            f'{BASE_URL}/api/add_tickets', headers=auth, timeout=60,
+            json={'title': f'Bench ticket {n}', 'description': 'Created by bench.api', 'priority': 'Medium',
+                  'customer_id': customer_ids[n % len(customer_ids)]}),
+        'ticket.update': lambda session, n: session.put(
+            f'{BASE_URL}/api/tickets/{ticket_id(n)}', headers=auth, timeout=60,
+            json={'status': ('Open', 'In Progress', 'Closed')[n % 3]}),
+        'dashboard.stats': get('/api/dashboard/stats'),
+        'customer.list': get('/api/view_customers'),
+        'customer.create': lambda session, n: session.post(
+            f'{BASE_URL}/api/add_customers', timeout=60,
+            json={'firstname': 'Bench', 'lastname': letters(n), 'company': 'Bench Ltd',
+                  'email': f'bench{run_id}x{n}@bench.example.com'}),
+    }
+
+
+def process_tree(pid):
+    """pid and all its descendants (Linux /proc)"""
+    children = {}
+    for entry in os.listdir('/proc'):
+        if entry.isdigit():
+            try:
+                with open(f'/proc/{entry}/stat') as f:
+                    ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+            except (OSError, IndexError, ValueError):
+                continue
+            children.setdefault(ppid, []).append(int(entry))
+    tree, pending = [], [pid]
+    while pending:
+        current = pending.pop()
+        tree.append(current)
+        pending.extend(children.get(current, []))
+    return tree
+
+
+def peak_rss_mb(pid):
+    """Largest peak RSS (VmHWM) among the server processes, or None off Linux"""
+    if not os.path.isdir('/proc'):
+        return None
+    peaks = []
+    for process in process_tree(pid):
+        try:
+            with open(f'/proc/{process}/status') as f:
+                for line in f:
+                    if line.startswith('VmHWM:'):
+                        peaks.append(int(line.split()[1]) / 1024)
+        except OSError:
+            continue
+    return round(max(peaks), 1) if peaks else None
+
+
+def git_commit():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True, text=True, check=True)
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=ROOT,
+                               capture_output=True, text=True, check=True)
+        return {'commit': commit.stdout.strip(), 'dirty': bool(dirty.stdout.strip())}
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database-url', help='default: a new SQLite file in a temp directory')
+    parser.add_argument('--no-seed', action='store_true', help='use the data already in --database-url')
+    parser.add_argument('--customers', type=int, default=1000)
+    parser.add_argument('--tickets', type=int, default=10000)
+    parser.add_argument('--server', choices=SERVERS, default='gunicorn')
+    parser.add_argument('--duration', type=float, default=5, help='seconds per scenario')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--scenarios', help='comma separated name prefixes, e.g. ticket,dashboard')
+    parser.add_argument('--cache', action='store_true', help='leave the response cache on')
+    parser.add_argument('--crm-delay', type=float, default=0.05, help='stub CRM latency in seconds')
+    parser.add_argument('--output', help='also write the JSON report to this file')
+    args = parser.parse_args()
+
+    database_url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='ssd-bench-'), 'bench.db')}"
+    report = {
+        'git': git_commit(),
+        'started_at': datetime.utcnow().isoformat(),
+        'python': sys.version.split()[0],
+        'database': database_url.split(':', 1)[0],
+        'server': args.server,
+        'concurrency': args.concurrency,
+        'duration': args.duration,
+        'cache': args.cache,
+    }
+
+    if not args.no_seed:
+        seeded = subprocess.run(
+            [sys.executable, '-m', 'bench.seed', '--database-url', database_url,
+             '--customers', str(args.customers), '--tickets', str(args.tickets)],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+        )
+        report['seed'] = json.loads(seeded.stdout.strip().splitlines()[-1])
+
+    stub = start_stub_crm(delay=args.crm_delay)
+    env = dict(os.environ,
+               SQLALCHEMY_DATABASE_URI=database_url,
+               CRM_SERVICE_URL=f'{stub.base_url}/integrate/ticket',
+               CUSTOMER_SERVICE_URL=f'{stub.base_url}/integrate/customer',
+               CACHE_ENABLED='true' if args.cache else 'false',
+               GUNICORN_BIND='127.0.0.1:5000',
+               GUNICORN_ACCESS_LOG='/dev/null',
+               FLASK_APP='wsgi')
+
+    server = start_server(SERVERS[args.server], env)
+    # main.py runs the outbox dispatcher itself; under gunicorn it is a separate process
+    dispatcher = None
+    if args.server == 'gunicorn':
+        dispatcher = subprocess.Popen([sys.executable, '-m', 'flask', 'outbox', 'run'], cwd=ROOT, env=env,
+                                      stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        session = requests.Session()
+        token = login(session)
+        customer_ids = [c['id'] for c in session.get(f'{BASE_URL}/api/view_customers', timeout=300).json()]
+        stats = session.get(f'{BASE_URL}/api/dashboard/stats', headers={'Authorization': f'Bearer {token}'},
+                            timeout=60).json()
+        max_ticket_id = max(stats['total'], 1)
+
+        selected = scenarios(token, customer_ids, max_ticket_id, run_id=int(time.time()))
+        if args.scenarios:
+            prefixes = tuple(args.scenarios.split(','))
+            selected = {name: make_request for name, make_request in selected.items() if name.startswith(prefixes)}
+
+        report['scenarios'] = {}
+        for name, make_request in selected.items():
+            report['scenarios'][name] = drive(make_request, args.concurrency, args.duration)
+        report['server_peak_rss_mb'] = peak_rss_mb(server.pid)
+        report['crm_requests'] = len(stub.requests)
+    finally:
+        if dispatcher:
+            stop_server(dispatcher)
+        stop_server(server)
+        stub.shutdown()
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""
+Helpers shared by the benchmark scripts: starting and stopping a backend
+server as a subprocess, logging in, driving endpoints with client threads
+and summarizing latencies.
+"""
+import os
+import subprocess
+import sys
+import threading
+import time
+import requests
+
+BASE_URL = 'http://127.0.0.1:5000'
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVERS = {
+    'dev': [sys.executable, 'main.py'],
+    'gunicorn': [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:app'],
+}
+BENCH_USER = {'name': 'Bench', 'username': 'bench', 'email': 'bench@company.com', 'password': 'bench-password'}
+
+
+def percentile(values, pct):
+    """pct-th percentile of a list of seconds, in milliseconds"""
+    if not values:
+        return None
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return round(values[index] * 1000, 2)
+
+
+def start_server(command, env):
+    try:
+        requests.get(f'{BASE_URL}/', timeout=1)
+        raise RuntimeError(f"Something is already listening on {BASE_URL}")
+    except requests.ConnectionError:
+        pass
+
+    process = subprocess.Popen(command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{' '.join(command)} exited with {process.returncode}")
+        try:
+            requests.get(f'{BASE_URL}/api/metrics/stream', timeout=5)
+            return process
+        except requests.RequestException:
+            time.sleep(0.2)
+    stop_server(process)
+    raise RuntimeError(f"{' '.join(command)} did not start listening")
+
+
+def stop_server(process):
+    process.terminate()
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+def login(session):
+    session.post(f'{BASE_URL}/api/register', json=BENCH_USER, timeout=10)
+    response = session.post(f'{BASE_URL}/api/login', json=BENCH_USER, timeout=10)
+    response.raise_for_status()
+    return response.json()['access_token']
+
+
+def drive(make_request, concurrency, duration):
+    """
+    Call make_request(session, n) from `concurrency` threads for `duration`
+    seconds; it returns a Response. Non-2xx/3xx answers and exceptions count as errors.
+    """
+    latencies, errors = [], []
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + duration
+
+    def worker(offset):
+        session = requests.Session()
+        mine, failed, n = [], 0, offset
+        while time.perf_counter() < stop_at:
+            began = time.perf_counter()
+            try:
+                ok = make_request(session, n).status_code < 400
+            except requests.RequestException:
+                ok = False
+            n += concurrency
+            if ok:
+                mine.append(time.perf_counter() - began)
+            else:
+                failed += 1
+        with lock:
+            latencies.extend(mine)
+            errors.append(failed)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(concurrency)]
+    began = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - began
+
+    return {
+        'requests': len(latencies),
+        'errors': sum(errors),
+        'requests_per_second': round(len(latencies) / elapsed, 1),
+        'latency_ms': {'p50': percentile(latencies, 50), 'p95': percentile(latencies, 95),
+                       'p99': percentile(latencies, 99)},
+    }
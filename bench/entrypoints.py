@@ -0,0 +1,74 @@
+"""
+Throughput of the development entry point (python main.py) against the
+production one (gunicorn -c gunicorn.conf.py wsgi:app).
+
+Both servers run one after the other on port 5000 against the same
+throwaway SQLite database, seeded by bench.seed with --customers customers
+and --tickets tickets. Each is then driven by --concurrency client threads for
+--duration seconds, cycling through a few read endpoints, and the report
+gives requests/second, error count and latency percentiles per server.
+
+    python -m bench.entrypoints --duration 15 --concurrency 32
+
+The response cache is disabled so every request does real work; pass
+--cache to measure the cached path instead. Set GUNICORN_WORKERS /
+GUNICORN_THREADS to try other worker layouts. SQLite serializes writes,
+so this only compares read throughput.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import requests
+from bench.common import BASE_URL, ROOT, SERVERS, start_server, stop_server, login, drive
+
+ENDPOINTS = [
+    '/api/view_tickets?limit=50',
+    '/api/view_tickets?limit=50&status=Open&priority=High',
+    '/api/dashboard/stats',
+    '/api/view_customers',
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--duration', type=float, default=10, help='seconds of load per server')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--customers', type=int, default=200)
+    parser.add_argument('--tickets', type=int, default=5000)
+    parser.add_argument('--cache', action='store_true', help='leave the response cache on')
+    parser.add_argument('--servers', default='dev,gunicorn', help='comma separated: ' + ','.join(SERVERS))
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='ssd-bench-')
+    env = dict(os.environ,
+               SQLALCHEMY_DATABASE_URI=f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+               CACHE_ENABLED='true' if args.cache else 'false',
+               GUNICORN_BIND='127.0.0.1:5000',
+               GUNICORN_ACCESS_LOG='/dev/null',
+               FLASK_APP='wsgi')
+    subprocess.run([sys.executable, '-m', 'bench.seed', '--database-url', env['SQLALCHEMY_DATABASE_URI'],
+                    '--customers', str(args.customers), '--tickets', str(args.tickets)],
+                   cwd=ROOT, check=True, stdout=subprocess.DEVNULL)
+
+    report = {'concurrency': args.concurrency, 'duration': args.duration, 'cache': args.cache,
+              'tickets': args.tickets, 'servers': {}}
+    for name in args.servers.split(','):
+        process = start_server(SERVERS[name], env)
+        try:
+            token = login(requests.Session())
+            headers = {'Authorization': f'Bearer {token}'}
+            report['servers'][name] = drive(
+                lambda session, n: session.get(f'{BASE_URL}{ENDPOINTS[n % len(ENDPOINTS)]}', headers=headers, timeout=30),
+                args.concurrency, args.duration,
+            )
+        finally:
+            stop_server(process)
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
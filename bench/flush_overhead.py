@@ -0,0 +1,96 @@
+"""
+Per-flush cost of SQLALCHEMY_TRACK_MODIFICATIONS on bulk ORM writes.
+
+Builds the same ticket-shaped model on an in-memory SQLite database twice,
+once with modification tracking on and once off, then inserts and updates
+--rows objects flushing every --chunk rows. Prints a JSON report with the
+mean time per flush and the peak Python memory of each run.
+
+    python -m bench.flush_overhead --rows 20000 --chunk 500
+
+SQLite keeps database time small, so the difference is mostly the
+bookkeeping Flask-SQLAlchemy does per flushed object.
+"""
+import argparse
+import json
+import time
+import tracemalloc
+from datetime import datetime
+from flask import Flask
+from flask_sqlalchemy import SQLAlchemy
+
+
+def build(track_modifications):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = track_modifications
+    db = SQLAlchemy(app)
+
+    class Ticket(db.Model):
+        __tablename__ = 'tickets'
+        id = db.Column(db.Integer, primary_key=True)
+        title = db.Column(db.String(100))
+        description = db.Column(db.String(256), nullable=False)
+        status = db.Column(db.String(50), nullable=False, default='Open')
+        priority = db.Column(db.String(50), nullable=False, default='Medium')
+        customer_id = db.Column(db.Integer, nullable=False)
+        updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    return app, db, Ticket
+
+
+def run(track_modifications, rows, chunk):
+    app, db, Ticket = build(track_modifications)
+    with app.app_context():
+        db.create_all()
+        insert_times, update_times = [], []
+
+        tracemalloc.start()
+        for start in range(0, rows, chunk):
+            for i in range(start, min(start + chunk, rows)):
+                db.session.add(Ticket(title=f'Ticket {i}', description='Printer is on fire',
+                                      priority='High', customer_id=i % 100))
+            began = time.perf_counter()
+            db.session.flush()
+            insert_times.append(time.perf_counter() - began)
+        db.session.commit()
+
+        tickets = Ticket.query.order_by(Ticket.id).all()
+        for start in range(0, rows, chunk):
+            for ticket in tickets[start:start + chunk]:
+                ticket.status = 'Closed'
+            began = time.perf_counter()
+            db.session.flush()
+            update_times.append(time.perf_counter() - began)
+        db.session.commit()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return {
+        'insert_flush_ms': round(sum(insert_times) / len(insert_times) * 1000, 3),
+        'update_flush_ms': round(sum(update_times) / len(update_times) * 1000, 3),
+        'peak_memory_mb': round(peak / 1024 / 1024, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--chunk', type=int, default=500, help='objects per flush')
+    args = parser.parse_args()
+
+    tracked = run(True, args.rows, args.chunk)
+    untracked = run(False, args.rows, args.chunk)
+    report = {
+        'rows': args.rows,
+        'chunk': args.chunk,
+        'track_modifications': tracked,
+        'no_track_modifications': untracked,
+        'insert_flush_saving_pct': round(100 * (1 - untracked['insert_flush_ms'] / tracked['insert_flush_ms']), 1),
+        'update_flush_saving_pct': round(100 * (1 - untracked['update_flush_ms'] / tracked['update_flush_ms']), 1),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
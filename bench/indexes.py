@@ -0,0 +1,146 @@
+"""
+Insert and query cost of the old single-column ticket indexes against the
+composite ones `flask indexes migrate` installs.
+
+    python -m bench.indexes --tickets 100000 --inserts 20000
+
+Seeds a throwaway SQLite database with bench.seed, then for each index set
+times --inserts ticket INSERTs (executemany, 1000 rows per commit; the rows
+are deleted again afterwards) and the read queries that depend on the
+indexes, served through the test client with the response cache off. Pass
+--database-url to run against MySQL instead.
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from bench.common import ROOT
+from bench.seed import ticket_rows, chunks
+
+INDEX_SETS = {
+    'single_column': {
+        'ix_tickets_title': ('title',),
+        'ix_tickets_description': ('description',),
+        'ix_tickets_status': ('status',),
+        'ix_tickets_priority': ('priority',),
+        'ix_tickets_category': ('category',),
+    },
+    'composite': {
+        'ix_tickets_status_priority_id': ('status', 'priority', 'id'),
+        'ix_tickets_customer_id_status': ('customer_id', 'status'),
+    },
+}
+QUERIES = {
+    'list_status': '/api/view_tickets?limit=50&status=Open',
+    'list_status_priority': '/api/view_tickets?limit=50&status=Open,In Progress&priority=High',
+    'list_status_priority_page_20': '/api/view_tickets?limit=50&status=Closed&priority=Low&after={after}',
+    'list_all_filtered': '/api/view_tickets?status=Closed&priority=High',
+}
+
+
+def use_index_set(db, name):
+    existing = {ix['name'] for ix in db.inspect(db.engine).get_indexes('tickets')}
+    mysql = db.engine.dialect.name == 'mysql'
+    with db.engine.begin() as connection:
+        for columns in INDEX_SETS.values():
+            for index in columns:
+                if index in existing:
+                    connection.exec_driver_sql(f"DROP INDEX {index} ON tickets" if mysql else f"DROP INDEX {index}")
+        for index, columns in INDEX_SETS[name].items():
+            connection.exec_driver_sql(f"CREATE INDEX {index} ON tickets ({', '.join(columns)})")
+        if not mysql:
+            connection.exec_driver_sql("ANALYZE")
+
+
+def time_inserts(db, Tickets, customer_ids, count):
+    from sqlalchemy import insert, delete
+    rows = list(ticket_rows(count, customer_ids, random.Random(7), datetime.utcnow()))
+    first_id = db.session.query(db.func.max(Tickets.id)).scalar() + 1
+    started = time.perf_counter()
+    for chunk in chunks(rows, 1000):
+        db.session.execute(insert(Tickets), chunk)
+        db.session.commit()
+    elapsed = time.perf_counter() - started
+    db.session.execute(delete(Tickets).where(Tickets.id >= first_id))
+    db.session.commit()
+    return round(count / elapsed, 1)
+
+
+def time_queries(app, repeat):
+    from flask_jwt_extended import create_access_token
+    from backend import db
+    from backend.models import Users
+    from backend.services import counters
+    # Authenticated routes look their user up, so the token has to name a real one
+    user = Users.query.filter_by(username='bench-indexes').first()
+    if user is None:
+        user = Users(username='bench-indexes', email='bench-indexes@company.com', name='Bench', password='')
+        db.session.add(user)
+        db.session.commit()
+    headers = {'Authorization': f'Bearer {create_access_token(identity=str(user.id))}'}
+    client = app.test_client()
+
+    # Cursor 20 pages into a filtered list
+    after = 0
+    for _ in range(20):
+        response = client.get(f'/api/view_tickets?limit=50&status=Closed&priority=Low&after={after}', headers=headers)
+        after = response.headers.get('X-Next-Cursor', after)
+
+    results = {}
+    for name, path in QUERIES.items():
+        path = path.format(after=after)
+        started = time.perf_counter()
+        for _ in range(repeat):
+            assert client.get(path, headers=headers).status_code == 200
+        results[name] = round((time.perf_counter() - started) * 1000 / repeat, 2)
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        counters.compute_from_tickets()
+    results['counters_recount'] = round((time.perf_counter() - started) * 1000 / repeat, 2)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database-url', help='default: a new SQLite file in a temp directory')
+    parser.add_argument('--customers', type=int, default=2000)
+    parser.add_argument('--tickets', type=int, default=100000)
+    parser.add_argument('--inserts', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=20, help='runs per query')
+    args = parser.parse_args()
+
+    database_url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='ssd-bench-'), 'bench.db')}"
+    subprocess.run([sys.executable, '-m', 'bench.seed', '--database-url', database_url,
+                    '--customers', str(args.customers), '--tickets', str(args.tickets)],
+                   cwd=ROOT, check=True, stdout=subprocess.DEVNULL)
+
+    os.environ['SQLALCHEMY_DATABASE_URI'] = database_url
+    os.environ['CACHE_ENABLED'] = 'false'
+    os.environ.setdefault('SLOW_QUERY_MS', '60000')
+    os.environ.setdefault('SLOW_REQUEST_MS', '60000')
+    from backend import app, db
+    from backend.models import Tickets, Customers
+
+    report = {'database': database_url.split(':', 1)[0], 'tickets': args.tickets, 'inserts': args.inserts}
+    with app.app_context():
+        customer_ids = [customer_id for (customer_id,) in db.session.query(Customers.id)]
+        for name in INDEX_SETS:
+            use_index_set(db, name)
+            report[name] = {
+                'insert_rows_per_second': time_inserts(db, Tickets, customer_ids, args.inserts),
+                'query_ms': time_queries(app, args.repeat),
+            }
+        # Leave the database with the model's indexes
+        use_index_set(db, 'composite')
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
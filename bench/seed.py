@@ -0,0 +1,135 @@
+"""
+Fill a database with synthetic customers and tickets for benchmarking.
+
+    python -m bench.seed --database-url sqlite:////tmp/ssd-bench.db \
+        --customers 10000 --tickets 100000
+
+Creates the schema (flask init-db), inserts rows with executemany in
+--chunk sized transactions, then rebuilds the dashboard counters and the
+search index so the database looks like one the app filled itself. Data
+is generated from --random-seed, so the same arguments give the same rows.
+Point --database-url at MySQL (mysql+mysqlconnector://...) to seed it
+instead; existing rows are kept.
+"""
+import argparse
+import json
+import os
+import random
+import time
+from datetime import datetime, timedelta
+
+STATUSES = ('Open', 'In Progress', 'Closed')
+PRIORITIES = ('Low', 'Medium', 'High')
+CATEGORIES = ('General', 'Billing', 'Technical', 'Account')
+WORDS = ('printer', 'login', 'invoice', 'refund', 'password', 'network', 'email', 'laptop', 'vpn',
+         'license', 'crash', 'slow', 'error', 'upgrade', 'billing', 'access', 'report', 'sync')
+
+
+def letters(n):
+    """Spreadsheet style column name for n (a, b, ... z, ba, bb, ...); customer names may only hold letters"""
+    name = ''
+    while True:
+        n, remainder = divmod(n, 26)
+        name = chr(ord('a') + remainder) + name
+        if not n:
+            return name.capitalize()
+
+
+def customer_rows(count, start, rng, now):
+    for i in range(start, start + count):
+        yield {
+            'firstname': rng.choice(('Ann', 'Bo', 'Cy', 'Dee', 'Eli', 'Fay', 'Gus', 'Hal')),
+            'lastname': letters(i),
+            'email': f'customer{i}@bench.example.com',
+            'company': f'Company {letters(i % 500)}',
+            'phone': f'555-{rng.randrange(100, 1000)}-{rng.randrange(1000, 10000)}',
+            'created_at': now - timedelta(days=rng.uniform(0, 365)),
+        }
+
+
+def ticket_rows(count, customer_ids, rng, now):
+    for i in range(count):
+        words = rng.sample(WORDS, 3)
+        created = now - timedelta(days=rng.uniform(0, 90))
+        yield {
+            'title': ' '.join(words[:2]).capitalize(),
+            'description': f"{' '.join(words)} reported by the customer, ticket {i}",
+            'status': rng.choices(STATUSES, weights=(5, 2, 3))[0],
+            'priority': rng.choices(PRIORITIES, weights=(3, 5, 2))[0],
+            'category': rng.choice(CATEGORIES),
+            'customer_id': rng.choice(customer_ids),
+            'created_at': created,
+            'updated_at': created + timedelta(hours=rng.uniform(0, 48)),
+        }
+
+
+def chunks(rows, size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def seed(database_url, customers, tickets, chunk=5000, random_seed=42):
+    # The backend reads its database URL at import time
+    os.environ['SQLALCHEMY_DATABASE_URI'] = database_url
+    # Every bulk INSERT would otherwise land in the slow query log
+    os.environ.setdefault('SLOW_QUERY_MS', '60000')
+    from sqlalchemy import insert, func
+    from backend import app, db
+    from backend.commands import init_database
+    from backend.models import Customers, Tickets
+    from backend.services import counters
+
+    rng = random.Random(random_seed)
+    now = datetime.utcnow()
+    timings = {}
+    with app.app_context():
+        started = time.perf_counter()
+        init_database()
+        timings['schema_seconds'] = round(time.perf_counter() - started, 2)
+
+        started = time.perf_counter()
+        existing = db.session.query(func.count(Customers.id)).scalar()
+        for rows in chunks(customer_rows(customers, existing, rng, now), chunk):
+            db.session.execute(insert(Customers), rows)
+            db.session.commit()
+        timings['customers_seconds'] = round(time.perf_counter() - started, 2)
+
+        started = time.perf_counter()
+        customer_ids = [customer_id for (customer_id,) in db.session.query(Customers.id)]
+        for rows in chunks(ticket_rows(tickets, customer_ids, rng, now), chunk):
+            db.session.execute(insert(Tickets), rows)
+            db.session.commit()
+        timings['tickets_seconds'] = round(time.perf_counter() - started, 2)
+
+        # Bulk inserts bypass the write routes, so derive counters and the index afterwards
+        started = time.perf_counter()
+        counters.rebuild()
+        init_database()
+        timings['counters_and_index_seconds'] = round(time.perf_counter() - started, 2)
+
+        return {
+            'customers': db.session.query(func.count(Customers.id)).scalar(),
+            'tickets': db.session.query(func.count(Tickets.id)).scalar(),
+            **timings,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database-url', required=True)
+    parser.add_argument('--customers', type=int, default=1000)
+    parser.add_argument('--tickets', type=int, default=10000)
+    parser.add_argument('--chunk', type=int, default=5000, help='rows per INSERT/commit')
+    parser.add_argument('--random-seed', type=int, default=42)
+    args = parser.parse_args()
+    print(json.dumps(seed(args.database_url, args.customers, args.tickets, args.chunk, args.random_seed)))
+
+
+if __name__ == '__main__':
+    main()
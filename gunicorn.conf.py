@@ -0,0 +1,44 @@
+"""
+gunicorn settings for the backend: gunicorn -c gunicorn.conf.py wsgi:app
+
+Pre-fork workers each run a pool of threads (gthread), so slow CRM calls and
+long-polls block one thread rather than a whole worker. An SSE stream holds
+its thread until the client disconnects: with the default 8 threads, 8 open
+dashboards leave a worker nothing to answer other requests with, so
+SSE_MAX_STREAMS (default 4) caps the streams per worker and refuses the rest
+with 503. Raise it together with GUNICORN_THREADS.
+Every value can be overridden from the environment.
+
+Reload code without dropping requests with `kill -HUP <master pid>`: new
+workers start first and old ones finish their in-flight requests (up to
+graceful_timeout seconds) before exiting.
+
+Each worker has its own DB connection pool (DB_POOL_SIZE + DB_MAX_OVERFLOW),
+response cache and live-update bus. Keep workers x pool within the
+database's max_connections, set CACHE_REDIS_URL to share the cache, and see
+backend/services/pubsub.py before streaming from more than one worker.
+"""
+import multiprocessing
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+worker_class = 'gthread'
+# Request threads per worker; SSE_MAX_STREAMS of them at most are held by live streams
+threads = int(os.environ.get('GUNICORN_THREADS', 8))
+
+# gthread workers heartbeat from the main thread, so this doesn't cut off SSE streams
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 60))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+
+# Recycle workers now and then to cap memory growth; jitter avoids restarting all at once
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 10000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 1000))
+
+# The app is imported in each worker: nothing opened at import time (DB pool,
+# CRM session, cache) is shared across fork, and HUP reloads the code
+preload_app = False
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-')
+errorlog = '-'
@@ -1,8 +1,12 @@
-from backend import app, db
-
-with app.app_context():
-    db.create_all()
-    print('Database created!')
+from backend import app
+from backend.commands import init_database
+from backend.services.outbox import start_dispatcher
 
+# Development server only; production serves wsgi:app with gunicorn (see gunicorn.conf.py)
 if __name__ == '__main__':
-    app.run(debug=True, port=5000, use_reloader=False)
\ No newline at end of file
+    with app.app_context():
+        init_database()
+        print('Database created!')
+    # Deliver queued CRM syncs from this process (use `flask outbox run` when serving elsewhere)
+    start_dispatcher(app)
+    app.run(debug=True, port=5000, use_reloader=False)
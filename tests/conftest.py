@@ -0,0 +1,19 @@
+import os
+import tempfile
+import pytest
+
+# The backend reads its configuration at import time, so point it at a throwaway SQLite file first
+_db_dir = tempfile.mkdtemp(prefix='ssd-tests-')
+os.environ['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(_db_dir, 'ssd.db')}"
+os.environ['CACHE_ENABLED'] = 'false'
+os.environ['SLOW_QUERY_MS'] = '60000'
+os.environ['SLOW_REQUEST_MS'] = '60000'
+
+
+@pytest.fixture(scope='session')
+def database():
+    from backend import app
+    from backend.commands import init_database
+    with app.app_context():
+        init_database()
+    return app
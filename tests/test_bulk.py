@@ -0,0 +1,51 @@
+import pytest
+from sqlalchemy import event
+from flask_jwt_extended import create_access_token
+from backend import db
+from backend.models import Customers, Users
+
+
+@pytest.fixture
+def headers(database):
+    with database.app_context():
+        user = Users(name='Importer', username='importer', email='importer@example.com', password='x')
+        db.session.add(user)
+        db.session.add(Customers(firstname='Bob', lastname='Stone', email='Bob@bulk.example.com', company='Co'))
+        db.session.commit()
+        user_id = user.id
+        token = create_access_token(identity=str(user_id))
+    # Requests made while an app context is pushed would share its g and session
+    yield {'Authorization': f'Bearer {token}', 'Content-Type': 'text/csv'}
+    with database.app_context():
+        Customers.query.filter(Customers.email.like('%@bulk.example.com')).delete(synchronize_session=False)
+        db.session.delete(db.session.get(Users, user_id))
+        db.session.commit()
+
+
+def test_import_rejects_existing_email(database, headers):
+    body = 'firstname,lastname,email,company\nBob,Stone,Bob@bulk.example.com,Co\nAnn,Lee,ann@bulk.example.com,Co\n'
+    response = database.test_client().post('/api/import/customers', data=body, headers=headers)
+
+    assert response.status_code == 200
+    assert response.json['imported'] == 1
+    assert response.json['errors'] == [{'row': 1, 'error': 'Email already exists'}]
+
+
+def test_existing_email_lookup_can_use_the_email_index(database, headers):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if 'FROM customers' in statement:
+            statements.append(statement.lower())
+
+    with database.app_context():
+        event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        body = 'firstname,lastname,email,company\nCy,Ode,cy@bulk.example.com,Co\n'
+        database.test_client().post('/api/import/customers', data=body, headers=headers)
+    finally:
+        with database.app_context():
+            event.remove(db.engine, 'before_cursor_execute', record)
+
+    lookups = [statement for statement in statements if 'customers.email in' in statement]
+    assert lookups and not any('lower(' in statement for statement in statements)
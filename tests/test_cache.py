@@ -0,0 +1,32 @@
+from sqlalchemy import insert
+from backend import db
+from backend.models import Customers
+from backend.services import etag
+
+URL = '/api/view_customers?limit=1&count=true'
+
+
+def test_write_from_another_worker_is_not_served_from_cache(database, monkeypatch):
+    monkeypatch.setitem(database.config, 'CACHE_ENABLED', True)
+    client = database.test_client()
+
+    first = client.get(URL)
+    assert client.get(URL).headers['X-Cache'] == 'HIT'
+
+    # Committed by another process: none of this process's after-commit events run
+    with database.app_context():
+        db.session.execute(insert(Customers).values(
+            firstname='Cy', lastname='Vale', email='cy.cache@example.com', company='Co'))
+        etag.bump('customers')
+        db.session.commit()
+
+    second = client.get(URL)
+    assert second.headers['X-Cache'] == 'MISS'
+    assert second.headers['ETag'] != first.headers['ETag']
+    assert int(second.headers['X-Total-Count']) == int(first.headers['X-Total-Count']) + 1
+    assert client.get(URL, headers={'If-None-Match': second.headers['ETag']}).status_code == 304
+
+    with database.app_context():
+        Customers.query.filter_by(email='cy.cache@example.com').delete()
+        etag.bump('customers')
+        db.session.commit()
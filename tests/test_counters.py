@@ -0,0 +1,46 @@
+from sqlalchemy import event
+from backend import db
+from backend.commands import init_database
+from backend.models import TicketCounters
+from backend.services import counters
+from backend.services.counters import counter_names
+
+
+def test_counter_names_fold_spellings():
+    # The update route stores 'HIGH'; the dashboard reads 'open_priority:High'
+    assert counter_names('open', 'HIGH') == counter_names('Open', 'High')
+    assert counter_names('Open', 'High') == ['total', 'status:Open', 'priority:High', 'open_priority:High']
+
+
+def test_counter_names_closed_tickets_are_not_open():
+    assert counter_names('CLOSED', 'high') == ['total', 'status:Closed', 'priority:High']
+
+
+def test_increment_creates_and_bumps_a_row_in_one_statement(database):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with database.app_context():
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            counters.increment(TicketCounters, {'name': 'test:upsert'}, 'value', 2)
+            counters.increment(TicketCounters, {'name': 'test:upsert'}, 'value', 3)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+        assert db.session.get(TicketCounters, 'test:upsert').value == 5
+        db.session.rollback()
+
+    assert len(statements) == 2 and all('ON CONFLICT' in statement for statement in statements)
+
+
+def test_init_database_fills_empty_counters(database):
+    with database.app_context():
+        expected, _ = counters.compute_from_tickets()
+        TicketCounters.query.delete()
+        db.session.commit()
+
+        init_database()
+        assert counters.read_counters() == dict(expected)
+        assert counters.verify() == []
@@ -0,0 +1,87 @@
+import time
+from datetime import timedelta
+import pytest
+from flask_jwt_extended import create_access_token
+from backend import db
+from backend.models import Users
+from backend.services import identity
+from backend.services.cache import ExpiringCache
+
+
+@pytest.fixture
+def user(database):
+    with database.app_context():
+        user = Users(name='Ida', username='ida', email='ida@example.com', password='x')
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.id
+        token = create_access_token(identity=str(user_id))
+    # Requests made while an app context is pushed would share its g and session
+    yield user_id, {'Authorization': f'Bearer {token}'}
+    with database.app_context():
+        db.session.delete(db.session.get(Users, user_id))
+        db.session.commit()
+
+
+def test_claims_cache_sits_on_flask_jwt_extendeds_decode_path(database, user):
+    # CachingJWTManager overrides a private JWTManager method; this fails if an upgrade stops calling it
+    _, headers = user
+    client = database.test_client()
+    before = identity.counters.snapshot()
+
+    assert client.get('/api/check_auth', headers=headers).status_code == 200
+    assert client.get('/api/check_auth', headers=headers).status_code == 200
+
+    after = identity.counters.snapshot()
+    assert after['claims_misses'] == before['claims_misses'] + 1
+    assert after['claims_hits'] == before['claims_hits'] + 1
+
+
+def test_logout_succeeds_whatever_the_token(database, user):
+    user_id, headers = user
+    client = database.test_client()
+    with database.app_context():
+        expired = create_access_token(identity=str(user_id), expires_delta=timedelta(seconds=-1))
+
+    assert client.post('/api/logout').status_code == 200
+    assert client.post('/api/logout', headers={'Authorization': f'Bearer {expired}'}).status_code == 200
+    assert client.post('/api/logout', headers={'Authorization': 'Bearer not-a-token'}).status_code == 200
+    assert client.post('/api/logout', headers=headers).status_code == 200
+    # Already revoked
+    assert client.post('/api/logout', headers=headers).status_code == 200
+
+
+def test_revoked_token_is_refused_until_it_expires(database, user):
+    user_id, headers = user
+    client = database.test_client()
+    with database.app_context():
+        other = {'Authorization': f'Bearer {create_access_token(identity=str(user_id))}'}
+
+    client.post('/api/logout', headers=headers)
+    # Cached claims don't skip the blocklist
+    assert client.get('/api/check_auth', headers=headers).status_code == 401
+    assert client.get('/api/check_auth', headers=other).status_code == 200
+
+
+def test_blocklist_only_forgets_expired_entries():
+    blocklist = ExpiringCache()
+    blocklist.set('ssd:revoked:short', '1', 0.01)
+    for n in range(1000):
+        blocklist.set(f'ssd:revoked:{n}', '1', 3600)
+    time.sleep(0.02)
+    blocklist.set('ssd:revoked:last', '1', 3600)
+
+    assert blocklist.get('ssd:revoked:0') == '1'
+    assert blocklist.get('ssd:revoked:short') is None
+    assert len(blocklist) == 1001
+
+
+def test_user_change_drops_the_cached_user(database, user):
+    user_id, headers = user
+    client = database.test_client()
+    assert client.get('/api/check_auth', headers=headers).json['name'] == 'Ida'
+
+    with database.app_context():
+        db.session.get(Users, user_id).name = 'Ida Renamed'
+        db.session.commit()
+    assert client.get('/api/check_auth', headers=headers).json['name'] == 'Ida Renamed'
@@ -0,0 +1,39 @@
+import pytest
+from flask_jwt_extended import create_access_token
+from backend import db
+from backend.models import Users
+
+ENDPOINTS = (
+    '/metrics',
+    '/api/metrics/crm',
+    '/api/metrics/cache',
+    '/api/metrics/stream',
+    '/api/metrics/pool',
+    '/api/metrics/auth',
+    '/api/metrics/queries',
+)
+
+
+@pytest.fixture(scope='module')
+def token(database):
+    with database.app_context():
+        user = Users(name='Operator', username='operator', email='operator@example.com', password='x')
+        db.session.add(user)
+        db.session.commit()
+        return create_access_token(identity=str(user.id))
+
+
+@pytest.mark.parametrize('url', ENDPOINTS)
+def test_metrics_need_a_login(database, url):
+    assert database.test_client().get(url).status_code == 401
+
+
+@pytest.mark.parametrize('url', ENDPOINTS)
+def test_metrics_with_a_login(database, token, url):
+    response = database.test_client().get(url, headers={'Authorization': f'Bearer {token}'})
+    assert response.status_code == 200
+
+
+def test_metrics_public(database, monkeypatch):
+    monkeypatch.setitem(database.config, 'METRICS_PUBLIC', True)
+    assert database.test_client().get('/metrics').status_code == 200
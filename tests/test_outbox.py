@@ -0,0 +1,84 @@
+import json
+import pytest
+from backend import db
+from backend.models import CrmOutbox, Customers, Tickets
+from backend.services import outbox
+from backend.services.crm import CrmError
+
+
+@pytest.fixture
+def ticket(database):
+    with database.app_context():
+        customer = Customers(firstname='Ann', lastname='Lee', email='ann.outbox@example.com', company='Co')
+        db.session.add(customer)
+        db.session.flush()
+        ticket = Tickets(title='Printer', description='jammed', customer_id=customer.id)
+        db.session.add(ticket)
+        db.session.flush()
+        outbox.enqueue('ticket.create', {'title': 'Printer'}, ticket_id=ticket.id, customer_id=customer.id)
+        db.session.commit()
+        yield ticket.id
+        CrmOutbox.query.delete()
+        db.session.delete(db.session.get(Tickets, ticket.id))
+        db.session.delete(db.session.get(Customers, customer.id))
+        db.session.commit()
+
+
+def test_crm_is_called_outside_a_transaction(database, ticket, monkeypatch):
+    calls = []
+
+    def create_ticket(payload):
+        # A transaction open here would hold outbox/ticket locks for the whole CRM call
+        calls.append((payload, db.session().in_transaction()))
+        return {'hubspot_ticket_id': 'hs-1'}
+
+    monkeypatch.setattr(outbox.client, 'create_ticket', create_ticket)
+    with database.app_context():
+        assert outbox.drain_once() == 1
+        assert calls == [({'title': 'Printer'}, False)]
+        assert db.session.get(Tickets, ticket).hubspot_ticket_id == 'hs-1'
+        assert CrmOutbox.query.filter_by(ticket_id=ticket).one().status == 'done'
+
+
+def test_failed_call_is_retried_later(database, ticket, monkeypatch):
+    def create_ticket(payload):
+        raise CrmError('503 from CRM')
+
+    monkeypatch.setattr(outbox.client, 'create_ticket', create_ticket)
+    with database.app_context():
+        assert outbox.drain_once() == 1
+        row = CrmOutbox.query.filter_by(ticket_id=ticket).one()
+        assert (row.status, row.attempts, row.last_error) == ('pending', 1, '503 from CRM')
+        # Backing off: not due on the next drain
+        assert outbox.drain_once() == 0
+
+
+def test_claimed_rows_are_skipped_until_the_claim_expires(database, ticket, monkeypatch):
+    monkeypatch.setattr(outbox, 'call_one_by_one', lambda calls: {})
+    with database.app_context():
+        # A dispatcher that claimed the row and died before storing a result
+        assert outbox.drain_once(claim_seconds=600) == 1
+        assert outbox.drain_once() == 0
+        assert json.loads(CrmOutbox.query.filter_by(ticket_id=ticket).one().payload) == {'title': 'Printer'}
+
+
+def test_ticket_waits_for_its_customers_contact(database, ticket, monkeypatch):
+    sent = []
+
+    def bulk(event):
+        def send(payloads):
+            sent.append(event)
+            return [{'hubspot_ticket_id': 'hs-1'} for _ in payloads]
+        return send
+
+    monkeypatch.setitem(outbox.BATCH_SENDERS, 'customer.create', bulk('customer.create'))
+    monkeypatch.setitem(outbox.BATCH_SENDERS, 'ticket.create', bulk('ticket.create'))
+    with database.app_context():
+        customer_id = CrmOutbox.query.filter_by(ticket_id=ticket).one().customer_id
+        outbox.enqueue('customer.create', {'email': 'ann.outbox@example.com'}, customer_id=customer_id)
+        db.session.commit()
+
+        # The contact was queued after the ticket but still goes first, on its own
+        assert outbox.drain_once(batching=True) == 1
+        assert outbox.drain_once(batching=True) == 1
+        assert sent == ['customer.create', 'ticket.create']
@@ -0,0 +1,77 @@
+import pytest
+from flask_jwt_extended import create_access_token
+from backend import db
+from backend.models import Customers, Tickets, Users
+from backend.services import search
+
+
+@pytest.fixture
+def setup(database):
+    with database.app_context():
+        user = Users(name='Seeker', username='seeker', email='seeker@example.com', password='x')
+        customer = Customers(firstname='Sue', lastname='Seek', email='sue@search.example.com', company='Co')
+        db.session.add_all([user, customer])
+        db.session.commit()
+        token = create_access_token(identity=str(user.id))
+        user_id, customer_id = user.id, customer.id
+    # Requests made while an app context is pushed would share its g and session
+    yield {'Authorization': f'Bearer {token}'}, customer_id
+    with database.app_context():
+        Tickets.query.filter_by(customer_id=customer_id).delete(synchronize_session=False)
+        db.session.delete(db.session.get(Customers, customer_id))
+        db.session.delete(db.session.get(Users, user_id))
+        db.session.commit()
+
+
+@pytest.fixture(params=['fts5', 'fallback'])
+def backend(request, database, monkeypatch):
+    with database.app_context():
+        assert search.active_backend() == 'fts5'
+    monkeypatch.setattr(search, '_backend', request.param)
+    return request.param
+
+
+def found(client, headers, q):
+    response = client.get('/api/tickets/search', query_string={'q': q}, headers=headers)
+    assert response.status_code == 200
+    return [ticket['id'] for ticket in response.json['results']]
+
+
+def test_search_follows_ticket_writes(database, setup, backend):
+    headers, customer_id = setup
+    client = database.test_client()
+
+    response = client.post('/api/add_tickets', headers=headers, json={
+        'title': 'Zyxwharf printer jammed', 'description': 'Paper stuck in tray', 'priority': 'High',
+        'category': 'General', 'customer_id': customer_id,
+    })
+    ticket_id = response.json['ticket_id']
+    assert found(client, headers, 'zyxwharf') == [ticket_id]
+    # Prefix match
+    assert found(client, headers, 'zyxw') == [ticket_id]
+
+    client.put(f'/api/tickets/{ticket_id}', headers=headers, json={'title': 'Quorbel scanner offline'})
+    assert found(client, headers, 'zyxwharf') == []
+    assert found(client, headers, 'quorbel scanner') == [ticket_id]
+    # The description was not touched and still matches
+    assert found(client, headers, 'tray') == [ticket_id]
+
+    client.delete(f'/api/tickets/{ticket_id}', headers=headers)
+    assert found(client, headers, 'quorbel') == []
+
+
+def test_search_sees_imported_tickets(database, setup, backend):
+    headers, customer_id = setup
+    body = (
+        'title,description,priority,category,customer_id\n'
+        f'Vexmoor login loop,Vexmoor vexmoor keeps redirecting,High,General,{customer_id}\n'
+        f'Password reset,Vexmoor mentioned once,Low,General,{customer_id}\n'
+    )
+    client = database.test_client()
+    response = client.post('/api/import/tickets', data=body, headers={**headers, 'Content-Type': 'text/csv'})
+    assert response.json['imported'] == 2
+
+    with database.app_context():
+        ids = dict(db.session.query(Tickets.title, Tickets.id).filter_by(customer_id=customer_id))
+    # Title and repeated hits rank first
+    assert found(client, headers, 'vexmoor') == [ids['Vexmoor login loop'], ids['Password reset']]
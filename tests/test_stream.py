@@ -0,0 +1,59 @@
+import pytest
+from flask_jwt_extended import create_access_token
+from backend import db
+from backend.models import Users
+from backend.services import etag
+
+
+@pytest.fixture
+def headers(database):
+    with database.app_context():
+        user = Users(name='Watcher', username='watcher', email='watcher@example.com', password='x')
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.id
+        token = create_access_token(identity=str(user_id))
+    # Requests made while an app context is pushed would share its g and session
+    yield {'Authorization': f'Bearer {token}'}
+    with database.app_context():
+        db.session.delete(db.session.get(Users, user_id))
+        db.session.commit()
+
+
+def poll(client, headers, after):
+    response = client.get(f'/api/stream/poll?after={after}&timeout=0', headers=headers)
+    assert response.status_code == 200
+    return response.json
+
+
+def test_poll_version_comes_from_the_database(database, headers):
+    client = database.test_client()
+    before = poll(client, headers, 0)
+
+    # An id from another worker's bus means nothing here, but the version is the same everywhere
+    assert poll(client, headers, before['last_id'] + 100)['version'] == before['version']
+
+    # A ticket write committed by another worker publishes nothing on this process's bus
+    with database.app_context():
+        etag.bump('tickets')
+        db.session.commit()
+    assert poll(client, headers, before['last_id'])['version'] == before['version'] + 1
+
+
+def test_streams_past_the_limit_are_refused(database, headers, monkeypatch):
+    monkeypatch.setitem(database.config, 'SSE_MAX_STREAMS', 2)
+    client = database.test_client()
+    streams = [client.get('/api/stream/tickets', headers=headers, buffered=False) for _ in range(2)]
+    assert [stream.status_code for stream in streams] == [200, 200]
+
+    refused = client.get('/api/stream/tickets', headers=headers, buffered=False)
+    assert refused.status_code == 503
+    assert refused.json['poll'] == '/api/stream/poll'
+    assert refused.headers['Retry-After']
+
+    # A closed stream frees its slot even if nothing was ever read from it
+    streams.pop().close()
+    streams.append(client.get('/api/stream/tickets', headers=headers, buffered=False))
+    assert streams[-1].status_code == 200
+    for stream in streams:
+        stream.close()
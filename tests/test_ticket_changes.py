@@ -0,0 +1,90 @@
+from datetime import datetime, timedelta
+import pytest
+from flask_jwt_extended import create_access_token
+from backend import db
+from backend.models import Customers, DataVersions, Tickets, Users
+from backend.services import etag
+
+
+@pytest.fixture
+def setup(database):
+    with database.app_context():
+        user = Users(name='Syncer', username='syncer', email='syncer@example.com', password='x')
+        customer = Customers(firstname='Dee', lastname='Sync', email='dee.sync@example.com', company='Co')
+        db.session.add_all([user, customer])
+        db.session.flush()
+        ticket_ids = []
+        for title in ('first', 'second', 'third'):
+            ticket = Tickets(title=title, description='d', customer_id=customer.id)
+            db.session.add(ticket)
+            db.session.flush()
+            ticket_ids.append(ticket.id)
+        db.session.commit()
+        token = create_access_token(identity=str(user.id))
+        user_id, customer_id = user.id, customer.id
+    # Requests made while an app context is pushed would share its g and session
+    yield {'Authorization': f'Bearer {token}'}, ticket_ids
+    with database.app_context():
+        Tickets.query.filter(Tickets.id.in_(ticket_ids)).delete(synchronize_session=False)
+        db.session.delete(db.session.get(Customers, customer_id))
+        db.session.delete(db.session.get(Users, user_id))
+        db.session.commit()
+
+
+def current_watermark(database):
+    with database.app_context():
+        return str(db.session.get(DataVersions, 'tickets').version)
+
+
+def sync(client, headers, since):
+    """Every change after since, following has_more; (changed ids, deleted ids, watermark)"""
+    changed, deleted = [], []
+    while True:
+        body = client.get('/api/tickets/changes', query_string={'since': since, 'limit': 1}, headers=headers).json
+        changed += [ticket['id'] for ticket in body['changes']]
+        deleted += body['deleted']
+        since = body['watermark']
+        if not body['has_more']:
+            return changed, deleted, since
+
+
+def test_changes_in_the_same_second_and_out_of_order(database, setup):
+    headers, (first, second, third) = setup
+    client = database.test_client()
+    since = current_watermark(database)
+
+    # Same second, the higher id first
+    assert client.put(f'/api/tickets/{third}', json={'status': 'In Progress'}, headers=headers).status_code == 200
+    assert client.put(f'/api/tickets/{first}', json={'status': 'In Progress'}, headers=headers).status_code == 200
+    changed, _, since = sync(client, headers, since)
+    assert changed == [third, first]
+
+    # A write stamped before the last one seen but committed after it
+    with database.app_context():
+        ticket = db.session.get(Tickets, second)
+        ticket.status = 'Closed'
+        ticket.updated_at = datetime.utcnow() - timedelta(minutes=5)
+        ticket.change_seq = etag.next_change('tickets')
+        db.session.commit()
+    changed, _, since = sync(client, headers, since)
+    assert changed == [second]
+
+    assert sync(client, headers, since)[:2] == ([], [])
+
+
+def test_deletes_are_reported_once_past_the_watermark(database, setup):
+    headers, (first, second, third) = setup
+    client = database.test_client()
+    since = current_watermark(database)
+
+    client.put(f'/api/tickets/{first}', json={'title': 'renamed'}, headers=headers)
+    client.delete(f'/api/tickets/{second}', headers=headers)
+    changed, deleted, since = sync(client, headers, since)
+    assert (changed, deleted) == ([first], [second])
+    assert sync(client, headers, since)[:2] == ([], [])
+
+
+def test_old_timestamp_watermark_is_rejected(database, setup):
+    headers, _ = setup
+    response = database.test_client().get('/api/tickets/changes?since=2024-01-01T00:00:00|5', headers=headers)
+    assert response.status_code == 400
@@ -0,0 +1,75 @@
+"""
+/api/view_tickets must run the same number of SQL statements however many
+tickets there are: one more statement per row (a lazy load, a per-row
+lookup) is what made the unpaged list slow before.
+"""
+import os
+import pytest
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+from bench.seed import seed
+from backend import app, db
+from backend.models import Users
+
+TICKETS = 200
+
+REQUESTS = (
+    '/api/view_tickets',
+    '/api/view_tickets?limit=50',
+    '/api/view_tickets?limit=50&count=true&status=Open,Closed',
+    '/api/view_tickets?limit=50&sort=updated_at&order=desc',
+    '/api/view_tickets?format=ndjson',
+    '/api/view_tickets?format=ndjson&limit=50&priority=High',
+)
+
+
+def statement_count(client, url, headers):
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', count)
+    try:
+        response = client.get(url, headers=headers)
+        # NDJSON rows are read from the cursor while the body streams
+        response.get_data()
+    finally:
+        event.remove(engine, 'before_cursor_execute', count)
+    assert response.status_code == 200, response.get_data(as_text=True)
+    return len(statements)
+
+
+@pytest.fixture(scope='module')
+def counts_by_size():
+    database_url = os.environ['SQLALCHEMY_DATABASE_URI']
+    seed(database_url, customers=20, tickets=TICKETS)
+    with app.app_context():
+        user = Users(name='Tester', username='tester', email='tester@example.com', password='x')
+        db.session.add(user)
+        db.session.commit()
+        token = create_access_token(identity=str(user.id))
+    headers = {'Authorization': f'Bearer {token}'}
+    client = app.test_client()
+
+    counts = {}
+    # The first request of each kind also loads the user; measure warm requests
+    for url in REQUESTS:
+        statement_count(client, url, headers)
+    counts[TICKETS] = {url: statement_count(client, url, headers) for url in REQUESTS}
+
+    seed(database_url, customers=0, tickets=TICKETS * 9)
+    counts[TICKETS * 10] = {url: statement_count(client, url, headers) for url in REQUESTS}
+    return counts
+
+
+@pytest.mark.parametrize('url', REQUESTS)
+def test_statement_count_does_not_grow_with_tickets(counts_by_size, url):
+    assert counts_by_size[TICKETS][url] == counts_by_size[TICKETS * 10][url]
+
+
+@pytest.mark.parametrize('url', REQUESTS)
+def test_statement_count_is_small(counts_by_size, url):
+    assert counts_by_size[TICKETS * 10][url] <= 5
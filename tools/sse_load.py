@@ -0,0 +1,145 @@
+"""
+Load test for the live ticket stream (/api/stream/tickets).
+
+Opens N concurrent SSE subscribers against a running backend, then
+triggers ticket updates and measures how many subscribers stay connected,
+how many events each receives, and the publish-to-receive latency.
+
+    python -m tools.sse_load --username agent --password secret \
+        --ticket-id 1 --subscribers 500 --events 20
+
+Every subscriber holds one server thread for the lifetime of its
+connection. The backend serves at most SSE_MAX_STREAMS per process and
+answers 503 past that (reported under connect_errors); with the limit
+set to 0, subscribers can take every thread and the updates this tool
+sends time out. Run with increasing --subscribers to find the limit for
+a deployment.
+"""
+import argparse
+import http.client
+import json
+import statistics
+import threading
+import time
+from urllib.parse import urlparse
+import requests
+
+
+class Subscriber(threading.Thread):
+    def __init__(self, base_url, token, ready):
+        super().__init__(daemon=True)
+        parsed = urlparse(base_url)
+        self.host, self.port = parsed.hostname, parsed.port or 80
+        self.token = token
+        self.ready = ready
+        self.connected = False
+        self.error = None
+        self.received = {}  # event id -> receive time
+
+    def run(self):
+        try:
+            conn = http.client.HTTPConnection(self.host, self.port, timeout=120)
+            conn.request('GET', '/api/stream/tickets', headers={'Authorization': f'Bearer {self.token}'})
+            response = conn.getresponse()
+            if response.status != 200:
+                raise RuntimeError(f"HTTP {response.status}")
+            self.connected = True
+            self.ready.release()
+
+            event_id = None
+            while True:
+                line = response.fp.readline()
+                if not line:
+                    break
+                line = line.decode().rstrip('\n')
+                if line.startswith('id: '):
+                    event_id = int(line[4:])
+                elif line.startswith('event: ticket.updated') and event_id is not None:
+                    self.received[event_id] = time.perf_counter()
+        except Exception as e:
+            self.error = str(e)
+            self.ready.release()
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return round(values[index] * 1000, 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--base-url', default='http://127.0.0.1:5000')
+    parser.add_argument('--token', help='JWT; alternatively pass --username/--password')
+    parser.add_argument('--username')
+    parser.add_argument('--password')
+    parser.add_argument('--ticket-id', type=int, required=True, help='existing ticket to update')
+    parser.add_argument('--subscribers', type=int, default=100)
+    parser.add_argument('--events', type=int, default=10)
+    parser.add_argument('--interval', type=float, default=0.5, help='seconds between updates')
+    parser.add_argument('--settle', type=float, default=3.0, help='seconds to wait for the last event')
+    args = parser.parse_args()
+
+    token = args.token
+    if not token:
+        response = requests.post(f"{args.base_url}/api/login",
+                                 json={'username': args.username, 'password': args.password}, timeout=10)
+        response.raise_for_status()
+        token = response.json()['access_token']
+
+    # 1. Connect all subscribers
+    ready = threading.Semaphore(0)
+    subscribers = [Subscriber(args.base_url, token, ready) for _ in range(args.subscribers)]
+    started = time.perf_counter()
+    for subscriber in subscribers:
+        subscriber.start()
+    for _ in subscribers:
+        ready.acquire(timeout=30)
+    connect_seconds = time.perf_counter() - started
+    connected = [s for s in subscribers if s.connected]
+
+    # 2. Fire updates and remember when each one was sent
+    session = requests.Session()
+    headers = {'Authorization': f'Bearer {token}'}
+    sent = []
+    for _ in range(args.events):
+        sent_at = time.perf_counter()
+        response = session.put(f"{args.base_url}/api/tickets/{args.ticket_id}", json={}, headers=headers, timeout=10)
+        response.raise_for_status()
+        sent.append(sent_at)
+        time.sleep(args.interval)
+    time.sleep(args.settle)
+
+    # 3. Match received events to sends: the k-th ticket.updated seen is the k-th update
+    latencies = []
+    complete = 0
+    for subscriber in connected:
+        times = [subscriber.received[k] for k in sorted(subscriber.received)][-len(sent):]
+        if len(times) == len(sent):
+            complete += 1
+        latencies.extend(received - sent_at for received, sent_at in zip(times, sent))
+
+    stream_stats = requests.get(f"{args.base_url}/api/metrics/stream", headers=headers, timeout=10).json()
+    report = {
+        'subscribers_requested': args.subscribers,
+        'subscribers_connected': len(connected),
+        'connect_errors': sorted({s.error for s in subscribers if s.error}),
+        'connect_seconds': round(connect_seconds, 2),
+        'events_sent': len(sent),
+        'subscribers_with_all_events': complete,
+        'delivery_latency_ms': {
+            'p50': percentile(latencies, 50),
+            'p95': percentile(latencies, 95),
+            'p99': percentile(latencies, 99),
+            'max': round(max(latencies) * 1000, 2) if latencies else None,
+            'mean': round(statistics.mean(latencies) * 1000, 2) if latencies else None,
+        },
+        'server': stream_stats,
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
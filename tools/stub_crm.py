@@ -0,0 +1,137 @@
+"""
+Local stand-in for the FastAPI/HubSpot CRM integration service.
+
+Implements the endpoints the backend calls, answering the way the real
+service does (plus the /batch endpoints used when CRM_BATCH_ENABLED is
+set), with optional latency and failure injection. Run it with
+
+    python -m tools.stub_crm --port 8000 --delay 0.2
+
+or start it in-process (tests, benchmarks) with start_stub_crm().
+"""
+import argparse
+import itertools
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+TICKET_PATH = '/integrate/ticket'
+CUSTOMER_PATH = '/integrate/customer'
+BATCH_SUFFIX = '/batch'
+TICKET_ITEM_PATH = re.compile(r'^/integrate/ticket/([^/]+)$')
+
+
+class StubCrmHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _read_json(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return json.loads(self.rfile.read(length) or b'{}')
+
+    def _reply(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _simulate(self):
+        """Apply the configured latency; returns False when this call should fail"""
+        if self.server.delay:
+            time.sleep(self.server.delay)
+        return random.random() >= self.server.fail_rate
+
+    def do_POST(self):
+        payload = self._read_json()
+        self.server.record(self.command, self.path, payload)
+        if not self._simulate():
+            return self._reply(503, {'detail': 'Injected failure'})
+
+        if self.path == TICKET_PATH:
+            return self._reply(201, self._ticket_result(payload))
+        if self.path == CUSTOMER_PATH:
+            return self._reply(201, self._contact_result(payload))
+        if self.path == TICKET_PATH + BATCH_SUFFIX:
+            return self._reply(200, {'results': [self._ticket_result(p) for p in payload['inputs']]})
+        if self.path == CUSTOMER_PATH + BATCH_SUFFIX:
+            return self._reply(200, {'results': [self._contact_result(p) for p in payload['inputs']]})
+        return self._reply(404, {'detail': 'Not Found'})
+
+    def _ticket_result(self, payload):
+        return {
+            'hubspot_ticket_id': f"stub-ticket-{next(self.server.ids)}",
+            'linked_to_contact': bool(payload.get('email')),
+        }
+
+    def _contact_result(self, payload):
+        return {'hubspot_contact_id': f"stub-contact-{next(self.server.ids)}"}
+
+    def do_PATCH(self):
+        payload = self._read_json()
+        self.server.record(self.command, self.path, payload)
+        if not self._simulate():
+            return self._reply(503, {'detail': 'Injected failure'})
+
+        match = TICKET_ITEM_PATH.match(self.path)
+        if match:
+            return self._reply(200, {'hubspot_ticket_id': match.group(1), 'updated': True})
+        return self._reply(404, {'detail': 'Not Found'})
+
+
+class StubCrmServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, delay=0.0, fail_rate=0.0, verbose=False):
+        super().__init__(address, StubCrmHandler)
+        self.delay = delay
+        self.fail_rate = fail_rate
+        self.verbose = verbose
+        self.ids = itertools.count(1)
+        self.requests = []
+        self._lock = threading.Lock()
+
+    def record(self, method, path, payload):
+        with self._lock:
+            self.requests.append((method, path, payload))
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def start_stub_crm(host='127.0.0.1', port=0, delay=0.0, fail_rate=0.0):
+    """Start the stub in a daemon thread; port=0 picks a free port. Call .shutdown() to stop."""
+    server = StubCrmServer((host, port), delay=delay, fail_rate=fail_rate)
+    threading.Thread(target=server.serve_forever, name='stub-crm', daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--delay', type=float, default=0.0, help='seconds of latency added to every call')
+    parser.add_argument('--fail-rate', type=float, default=0.0, help='fraction of calls answered with 503')
+    parser.add_argument('--verbose', action='store_true')
+    args = parser.parse_args()
+
+    server = StubCrmServer((args.host, args.port), delay=args.delay, fail_rate=args.fail_rate,
+                           verbose=args.verbose)
+    print(f"Stub CRM listening on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
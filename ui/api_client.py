@@ -1,28 +1,221 @@
+import os
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 import requests
 import streamlit as st
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 BASE_URL = "http://127.0.0.1:5000"
 
+# Connection reuse and retries for calls to the backend
+HTTP_TIMEOUT = float(os.environ.get("UI_HTTP_TIMEOUT", 10))
+HTTP_RETRIES = int(os.environ.get("UI_HTTP_RETRIES", 2))
+HTTP_BACKOFF = float(os.environ.get("UI_HTTP_BACKOFF", 0.3))
+HTTP_POOL_SIZE = int(os.environ.get("UI_HTTP_POOL_SIZE", 4))
+# Only retry requests that are safe to send twice; a POST may have been applied already
+RETRY_METHODS = frozenset({'GET', 'HEAD', 'PUT', 'DELETE'})
+RETRY_STATUSES = (502, 503, 504)
+TIMINGS_KEPT = 50
+# Cached GET responses kept per session, least recently used dropped first
+RESPONSE_CACHE_KEPT = 64
+# Background GETs started by prefetch() that no page has used yet, per session
+PREFETCH_KEPT = 8
 
-def api_request(method, endpoint, payload=None, params=None):
-    url = BASE_URL + endpoint
+_prefetcher = ThreadPoolExecutor(max_workers=2, thread_name_prefix='ui-prefetch')
+
+# Reads served from the session's cache for UI_CACHE_TTL seconds, and the data each one shows
+CACHE_TTL = float(os.environ.get("UI_CACHE_TTL", 60))
+CACHED_READS = {
+    '/api/view_customers': ('customers',),
+    '/api/view_tickets': ('tickets', 'customers'),
+    '/api/dashboard/stats': ('tickets', 'customers'),
+}
+# Writes (by path prefix) and the data they change
+WRITES = (
+    ('/api/add_tickets', ('tickets',)),
+    ('/api/tickets/', ('tickets',)),
+    ('/api/add_customers', ('customers',)),
+    ('/api/update_customers/', ('customers',)),
+    ('/api/delete_customers/', ('customers', 'tickets')),
+)
+
+
+def _http_session():
+    """One keep-alive requests.Session per browser session, with retries on connection errors and 502/503/504"""
+    if '_http_session' not in st.session_state:
+        retry = Retry(
+            total=HTTP_RETRIES,
+            backoff_factor=HTTP_BACKOFF,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=RETRY_METHODS,
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        session = requests.Session()
+        session.mount(BASE_URL, HTTPAdapter(pool_connections=1, pool_maxsize=HTTP_POOL_SIZE, max_retries=retry))
+        session.headers.update({"Accept-Encoding": "gzip, deflate"})
+        st.session_state._http_session = session
+    return st.session_state._http_session
+
+
+def _server_time_ms(response):
+    """total;dur from the backend's Server-Timing header, if any"""
+    for metric in response.headers.get("Server-Timing", "").split(","):
+        name, _, params = metric.strip().partition(";")
+        if name == "total" and params.startswith("dur="):
+            try:
+                return float(params[4:])
+            except ValueError:
+                return None
+    return None
+
+
+def _record_timing(method, endpoint, response, started, prefetched=False):
+    if '_request_timings' not in st.session_state:
+        st.session_state._request_timings = deque(maxlen=TIMINGS_KEPT)
+    st.session_state._request_timings.append({
+        "method": method,
+        "endpoint": endpoint,
+        "status": response.status_code if response is not None else None,
+        # For a prefetched response this is only the wait for it to finish
+        "total_ms": round((time.perf_counter() - started) * 1000, 1),
+        "server_ms": _server_time_ms(response) if response is not None else None,
+        "prefetched": prefetched,
+    })
+
+
+def request_timings():
+    """Most recent backend calls of this session, newest last"""
+    return list(st.session_state.get('_request_timings', ()))
+
+
+def _response_cache():
+    """
+    Last 200 response per GET url+params: {'response', 'fresh_until', 'namespaces'}.
+    CACHED_READS are answered from here until fresh_until; after that, or for
+    any other GET, the next request revalidates it with its ETag. Holds the
+    RESPONSE_CACHE_KEPT most recently used entries.
+    """
+    if '_response_cache' not in st.session_state:
+        st.session_state._response_cache = OrderedDict()
+    return st.session_state._response_cache
+
+
+def invalidate_cache(*namespaces):
+    """Make cached reads of these namespaces (all if none given) revalidate on next use"""
+    for entry in _response_cache().values():
+        if not namespaces or set(namespaces) & set(entry['namespaces']):
+            entry['fresh_until'] = 0
+
+    # A prefetch may have read the data before the change; api_request would store it as fresh
+    pending = _prefetched()
+    for cache_key in list(pending):
+        endpoint = cache_key[0][len(BASE_URL):]
+        if not namespaces or set(namespaces) & set(CACHED_READS.get(endpoint, ())):
+            pending.pop(cache_key).cancel()
+
+
+def _written_namespaces(method, endpoint):
+    # '/api/tickets/' also prefixes read routes
+    if method == 'GET':
+        return ()
+    return tuple({ns for prefix, namespaces in WRITES if endpoint.startswith(prefix) for ns in namespaces})
+
+
+def _request_headers(cached=None):
     headers = {"Content-Type": "application/json"}
 
     if 'jwt_token' in st.session_state and st.session_state.jwt_token:
         headers["Authorization"] = f"Bearer {st.session_state.jwt_token}"
+    if cached is not None and cached['response'].headers.get("ETag"):
+        headers["If-None-Match"] = cached['response'].headers["ETag"]
+    return headers
+
+
+def _prefetched():
+    """(url, params) -> Future of a GET response started by prefetch()"""
+    if '_prefetched' not in st.session_state:
+        st.session_state._prefetched = {}
+    return st.session_state._prefetched
+
 
+def prefetch(endpoint, params=None):
+    """
+    Start a GET in the background (e.g. the next page of a table) so that the
+    api_request for the same endpoint and params finds it done or in flight.
+    """
+    url = BASE_URL + endpoint
+    cache_key = (url, tuple(sorted((params or {}).items())))
+    cached = _response_cache().get(cache_key)
+    pending = _prefetched()
+    if cache_key in pending or (cached is not None and cached['fresh_until'] > time.monotonic()):
+        return
+    # The worker thread has no Streamlit context, so it gets everything it needs up front
+    pending[cache_key] = _prefetcher.submit(
+        _http_session().get, url, params=params, headers=_request_headers(cached), timeout=HTTP_TIMEOUT
+    )
+    while len(pending) > PREFETCH_KEPT:
+        pending.pop(next(iter(pending))).cancel()
+
+
+def api_request(method, endpoint, payload=None, params=None):
+    url = BASE_URL + endpoint
+    cache_key = (url, tuple(sorted((params or {}).items())))
+    cached = _response_cache().get(cache_key) if method.upper() == 'GET' else None
+    if cached is not None:
+        _response_cache().move_to_end(cache_key)
+    if cached is not None and cached['fresh_until'] > time.monotonic():
+        # Nothing this session wrote or heard about has changed it; no backend call
+        return cached['response']
+
+    headers = _request_headers(cached)
+    session = _http_session()
+    started = time.perf_counter()
+    response = None
+    prefetched = None
     try:
         if method.upper() == 'GET':
-            response = requests.get(url, params=params, headers=headers, timeout=10)
+            prefetched = _prefetched().pop(cache_key, None)
+            if prefetched is not None:
+                try:
+                    response = prefetched.result(timeout=HTTP_TIMEOUT)
+                except Exception:
+                    # A failed or stuck prefetch is retried in the foreground
+                    response = None
+            if response is None:
+                response = session.get(url, params=params, headers=headers, timeout=HTTP_TIMEOUT)
+
+            if response.status_code == 304 and cached is not None:
+                # Unchanged on the server, reuse the body we already have
+                if cached['namespaces']:
+                    cached['fresh_until'] = time.monotonic() + CACHE_TTL
+                return cached['response']
+            namespaces = CACHED_READS.get(endpoint, ())
+            if response.status_code == 200 and (namespaces or response.headers.get("ETag")):
+                responses = _response_cache()
+                responses[cache_key] = {
+                    'response': response,
+                    'fresh_until': time.monotonic() + CACHE_TTL if namespaces else 0,
+                    'namespaces': namespaces,
+                }
+                responses.move_to_end(cache_key)
+                while len(responses) > RESPONSE_CACHE_KEPT:
+                    responses.popitem(last=False)
         elif method.upper() == 'POST':
-            response = requests.post(url, json=payload, headers=headers, timeout=10)
+            response = session.post(url, json=payload, headers=headers, timeout=HTTP_TIMEOUT)
         elif method.upper() == 'PUT':
-            response = requests.put(url, json=payload, headers=headers, timeout=10)
+            response = session.put(url, json=payload, headers=headers, timeout=HTTP_TIMEOUT)
         elif method.upper() == 'DELETE':
-            response = requests.delete(url, headers=headers, timeout=10)
+            response = session.delete(url, headers=headers, timeout=HTTP_TIMEOUT)
         else:
             return None
 
+        if response.status_code < 400:
+            written = _written_namespaces(method.upper(), endpoint)
+            if written:
+                invalidate_cache(*written)
         return response
 
     except requests.exceptions.ConnectionError:
@@ -34,6 +227,8 @@ def api_request(method, endpoint, payload=None, params=None):
     except requests.exceptions.RequestException as e:
         st.error(f"⚠️ Request failed: {str(e)}")
         return None
+    finally:
+        _record_timing(method.upper(), endpoint, response, started, prefetched is not None)
 
 
 def check_session():
@@ -41,7 +236,7 @@ def check_session():
         return False, None
     headers = {"Authorization": f"Bearer {st.session_state.jwt_token}"}
     try:
-        response = requests.get(BASE_URL + "/api/check_auth", timeout=5)
+        response = _http_session().get(BASE_URL + "/api/check_auth", headers=headers, timeout=5)
         if response.status_code == 200:
             data = response.json()
             return True, data.get("name")
@@ -52,5 +247,8 @@ def check_session():
 def clear_session():
     if 'jwt_token' in st.session_state:
         del st.session_state.jwt_token
+    for key in ('_response_cache', '_prefetched', '_request_timings', '_pagers'):
+        if key in st.session_state:
+            del st.session_state[key]
     if 'user' in st.session_state:
         del st.session_state.user
\ No newline at end of file
@@ -1,6 +1,6 @@
 import pandas as pd
 import streamlit as st
-from api_client import check_session, api_request, clear_session
+from api_client import check_session, api_request, clear_session, request_timings, invalidate_cache, prefetch
 import time
 
 st.set_page_config(
@@ -97,6 +97,72 @@ def fetch_tickets(status_filter=None, priority_filter=None):
         return None
 
 
+LIVE_POLL_SECONDS = 5
+
+PAGE_SIZES = [25, 50, 100, 250]
+TICKET_SORTS = {
+    "Newest first": ('id', 'desc'),
+    "Oldest first": ('id', 'asc'),
+    "Recently updated": ('updated_at', 'desc'),
+    "Least recently updated": ('updated_at', 'asc'),
+}
+
+
+def fetch_page(name, endpoint, params, page_size):
+    """
+    One page of a keyset-paged list endpoint (limit/after, X-Next-Cursor).
+    The cursors of the pages visited so far are kept per table, so Previous
+    steps back without walking from the start; they reset when the filters,
+    sort or page size change. The next page is prefetched in the background.
+    Returns (response, pager) where pager has 'page', 'has_next' and 'total'.
+    """
+    pagers = st.session_state.setdefault('_pagers', {})
+    query = (endpoint, tuple(sorted(params.items())), page_size)
+    pager = pagers.get(name)
+    if pager is None or pager['query'] != query:
+        pager = pagers[name] = {'query': query, 'cursors': [None], 'page': 0, 'total': None, 'has_next': False}
+
+    page_params = dict(params, limit=page_size)
+    cursor = pager['cursors'][pager['page']]
+    if cursor:
+        page_params['after'] = cursor
+    else:
+        # Counted once, on the first page
+        page_params['count'] = 'true'
+
+    resp = api_request('GET', endpoint, None, page_params)
+    if not resp or resp.status_code != 200:
+        return resp, pager
+
+    if resp.headers.get('X-Total-Count'):
+        pager['total'] = int(resp.headers['X-Total-Count'])
+    next_cursor = resp.headers.get('X-Next-Cursor')
+    pager['has_next'] = bool(next_cursor)
+    if next_cursor:
+        del pager['cursors'][pager['page'] + 1:]
+        pager['cursors'].append(next_cursor)
+        prefetch(endpoint, dict(params, limit=page_size, after=next_cursor))
+    return resp, pager
+
+
+def page_controls(name, pager, page_size, label):
+    total = pager['total']
+    pages = max(1, -(-total // page_size)) if total is not None else None
+    c_prev, c_info, c_next = st.columns([1, 4, 1])
+    with c_prev:
+        if st.button("◀ Previous", key=f"{name}_prev", disabled=pager['page'] == 0, use_container_width=True):
+            pager['page'] -= 1
+            st.rerun()
+    with c_info:
+        of_pages = f" of {pages}" if pages else ""
+        of_total = f" · {total:,} {label}" if total is not None else ""
+        st.caption(f"Page {pager['page'] + 1}{of_pages}{of_total}")
+    with c_next:
+        if st.button("Next ▶", key=f"{name}_next", disabled=not pager['has_next'], use_container_width=True):
+            pager['page'] += 1
+            st.rerun()
+
+
 def navigate_to(view):
     st.session_state.current_view = view
     st.rerun()
@@ -217,15 +283,44 @@ def login_view():
                 navigate_to('register')
 
 
+@st.fragment(run_every=LIVE_POLL_SECONDS)
+def live_updates():
+    """
+    Check the backend's ticket event stream and rerun the page when tickets
+    changed, so counters and tables update without pressing Refresh.
+    """
+    params = {'after': st.session_state.get('last_event_id', 0), 'timeout': 0}
+    resp = api_request('GET', '/api/stream/poll', None, params)
+
+    if resp and resp.status_code == 200:
+        data = resp.json()
+        st.session_state.last_event_id = data['last_id']
+        # Event ids are per backend worker; the tickets version is shared, so only it means a change
+        previous = st.session_state.get('tickets_version')
+        st.session_state.tickets_version = data['version']
+        st.caption("🟢 Live")
+        if previous is not None and data['version'] != previous:
+            # Someone changed tickets; cached ticket lists and stats must be revalidated
+            invalidate_cache('tickets')
+            st.rerun()
+    else:
+        st.caption("⚪ Offline")
+
+
 def dashboard_view():
     c_title, c_user, c_refresh, c_logout = st.columns([5, 2, 1, 1])
     with c_title:
         st.subheader(f"👋 Welcome, {st.session_state.user}!")
+    with c_user:
+        live_updates()
     with c_refresh:
         if st.button("🔄 Refresh"):
+            invalidate_cache()
             st.rerun()
     with c_logout:
         if st.button("Logout", type="primary"):
+            # Revoke the token server side before forgetting it
+            api_request('POST', '/api/logout')
             if 'jwt_token' in st.session_state:
                 del st.session_state.jwt_token
             st.session_state.user = None
@@ -309,6 +404,19 @@ def dashboard_view():
     elif selection == "Delete Customer":
         delete_customer(selection)
 
+    backend_latency()
+
+
+def backend_latency():
+    """Latency of this session's recent backend calls; server_ms is the backend's own Server-Timing total"""
+    timings = request_timings()
+    if not timings:
+        return
+    with st.sidebar.expander("⏱️ Backend Latency"):
+        df = pd.DataFrame(timings)
+        st.caption(f"Last {len(df)} calls · median {df['total_ms'].median():.0f} ms")
+        st.dataframe(df.iloc[::-1], hide_index=True, use_container_width=True)
+
 
 def view_ticket(selection):
     if selection == "View Tickets":
@@ -328,29 +436,40 @@ def view_ticket(selection):
             key="priority_filter"
         )
 
-        resp = fetch_tickets(status_filter if status_filter else None,
-                           priority_filter if priority_filter else None)
+        sort_label = st.sidebar.selectbox("Sort", list(TICKET_SORTS), key="ticket_sort")
+        page_size = st.sidebar.selectbox("Rows per page", PAGE_SIZES, index=1, key="ticket_page_size")
+
+        sort, order = TICKET_SORTS[sort_label]
+        params = {'sort': sort, 'order': order}
+        if status_filter:
+            params['status'] = ",".join(sorted(status_filter))
+        if priority_filter:
+            params['priority'] = ",".join(sorted(priority_filter))
+
+        # Filtering, sorting and paging happen on the server; only this page is held and rendered
+        resp, pager = fetch_page('tickets', '/api/view_tickets', params, page_size)
 
         if resp and resp.status_code == 200:
-            tickets = resp.json()
-            if tickets:
-                df = pd.DataFrame(tickets)
-                if 'customer_name' in df.columns:
-                    df = df.rename(columns={
-                        'id':"ID",
-                        'title': 'Title',
-                        'customer_name': 'Customer',
-                        'status': 'Status',
-                        'priority': 'Priority',
-                        'description': 'Description'
-                    })
-
-                    cols_to_show = ['ID','Title', 'Customer', 'Status', 'Priority', 'Description']
-                    st.dataframe(df[cols_to_show], use_container_width=True, hide_index=True)
-                else:
-                    st.dataframe(df, use_container_width=True)
+            df = pd.DataFrame(resp.json())
+
+            if not df.empty:
+                df = df.rename(columns={
+                    'id':"ID",
+                    'title': 'Title',
+                    'customer_name': 'Customer',
+                    'status': 'Status',
+                    'priority': 'Priority',
+                    'description': 'Description'
+                })
+
+                cols_to_show = ['ID','Title', 'Customer', 'Status', 'Priority', 'Description']
+                st.dataframe(df[cols_to_show], use_container_width=True, hide_index=True)
+                page_controls('tickets', pager, page_size, 'tickets')
             else:
                 st.info("No tickets match the selected filters.")
+                # Rows deleted since the earlier pages were read can leave a page empty
+                if pager['page']:
+                    page_controls('tickets', pager, page_size, 'tickets')
         elif resp and resp.status_code == 401:
             st.error("⚠️ Session expired. Please log in again.")
             time.sleep(2)
@@ -562,16 +681,21 @@ def view_customer(selection):
     if selection == "View Customers":
         st.header("👥 All Customers")
 
-        customers = fetch_customers()
+        page_size = st.sidebar.selectbox("Rows per page", PAGE_SIZES, index=1, key="customer_page_size")
+        resp, pager = fetch_page('customers', '/api/view_customers', {}, page_size)
+        customers = resp.json() if resp and resp.status_code == 200 else []
 
         if customers:
             df = pd.DataFrame(customers)
             desired_order = ['id', 'firstname','lastname', 'email', 'phone','company']
 
             cols_to_show = [c for c in desired_order if c in df.columns]
-            st.dataframe(df[cols_to_show])
+            st.dataframe(df[cols_to_show], use_container_width=True, hide_index=True)
+            page_controls('customers', pager, page_size, 'customers')
         else:
             st.info("No customers found.")
+            if pager['page']:
+                page_controls('customers', pager, page_size, 'customers')
 
 
 def create_customer(selection):
@@ -0,0 +1,10 @@
+"""
+Production entry point: gunicorn -c gunicorn.conf.py wsgi:app
+
+Importing this module does no database work. Create the schema once per
+deploy with `flask init-db`, and run the CRM outbox dispatcher
+as its own process with `flask outbox run`.
+"""
+from backend import app
+
+application = app